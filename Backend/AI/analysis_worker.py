@@ -0,0 +1,306 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from log_analysis_pipeline import DEFAULT_BATCH_SIZE, analyze_log_file, load_default_model
+from log_summary_generator import DEFAULT_TOP_ENTRIES, add_recommendations, compact_result, get_entries_path
+from pipeline_perf import PerfRun, perf_stage
+from redhawk_assistant import RedHawkAssistant
+from summary_writer import DEFAULT_INDENT, write_summary
+from url_scan import DEFAULT_HOST_CONCURRENCY, HostLimiter, build_scan_report
+
+# Number of RedHawkAssistant instances (one per summary file) kept in memory
+MAX_CACHED_ASSISTANTS = 8
+
+class AnalysisWorker:
+    """
+    Long-lived worker that keeps the model and chat assistants resident.
+
+    Jobs arrive as one JSON object per line:
+        {"id": "42", "type": "analyze", "params": {"log_file": "...", "summary_file": "..."}}
+        {"id": "43", "type": "chat", "params": {"query": "...", "summary_file": "..."}}
+        {"id": "44", "type": "scan", "params": {"url": "https://...", "skip_ai": true}}
+        {"id": "45", "type": "health"}
+    and each gets exactly one JSON line back:
+        {"id": "42", "ok": true, "result": {...}, "seconds": 0.84}
+        {"id": "43", "ok": false, "error": "..."}
+    Responses are written as jobs finish, so they may come back out of order.
+    """
+    def __init__(self, max_concurrency=4, max_pending=16, api_key=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.model_components = load_default_model()
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        # Running plus queued jobs; anything beyond this is rejected straight away
+        self.slots = threading.BoundedSemaphore(max_concurrency + max_pending)
+
+        self.assistants = OrderedDict()
+        self.assistants_lock = threading.Lock()
+
+        # Scan jobs running at once share the per-host request cap
+        self.host_limiter = HostLimiter()
+
+        self.stats_lock = threading.Lock()
+        self.started_at = time.time()
+        self.active_jobs = 0
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+        self.rejected_jobs = 0
+
+        self.handlers = {
+            'analyze': self.run_analyze,
+            'chat': self.run_chat,
+            'scan': self.run_scan,
+        }
+
+    def submit(self, request, respond):
+        """Queue a parsed request; respond(dict) is called once with its response"""
+        job_id = request.get('id')
+        job_type = request.get('type')
+
+        if job_type == 'health':
+            respond({'id': job_id, 'ok': True, 'result': self.health()})
+            return
+
+        handler = self.handlers.get(job_type)
+        if handler is None:
+            respond({'id': job_id, 'ok': False, 'error': f"Unknown job type: {job_type}"})
+            return
+
+        if not self.slots.acquire(blocking=False):
+            with self.stats_lock:
+                self.rejected_jobs += 1
+            respond({'id': job_id, 'ok': False, 'error': 'Worker busy, too many pending jobs'})
+            return
+
+        self.executor.submit(self.run_job, job_id, handler, request.get('params') or {}, respond)
+
+    def run_job(self, job_id, handler, params, respond):
+        with self.stats_lock:
+            self.active_jobs += 1
+        start_time = time.perf_counter()
+        try:
+            result = handler(params)
+            response = {'id': job_id, 'ok': True, 'result': result}
+            succeeded = True
+        except Exception as e:
+            response = {'id': job_id, 'ok': False, 'error': str(e)}
+            succeeded = False
+        response['seconds'] = round(time.perf_counter() - start_time, 4)
+
+        with self.stats_lock:
+            self.active_jobs -= 1
+            if succeeded:
+                self.completed_jobs += 1
+            else:
+                self.failed_jobs += 1
+        self.slots.release()
+
+        try:
+            respond(response)
+        except Exception as e:
+            print(f"Error sending response for job {job_id}: {str(e)}", file=sys.stderr)
+
+    def health(self):
+        with self.stats_lock:
+            return {
+                'status': 'ok',
+                'pid': os.getpid(),
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'model_loaded': self.model_components.get('model') is not None,
+                'active_jobs': self.active_jobs,
+                'completed_jobs': self.completed_jobs,
+                'failed_jobs': self.failed_jobs,
+                'rejected_jobs': self.rejected_jobs,
+                'max_concurrency': self.max_concurrency,
+                'max_pending': self.max_pending,
+                'cached_assistants': len(self.assistants),
+            }
+
+    def run_analyze(self, params):
+        """Same result as run_analysis.py, using the resident model"""
+        log_file = params.get('log_file')
+        if not log_file:
+            raise ValueError("'log_file' is required")
+
+        # Each job runs in its own thread, so its stages land in its own run
+        with PerfRun() as perf_run:
+            analysis_result, predictions_path = analyze_log_file(
+                log_file, self.model_components,
+                batch_size=params.get('batch_size') or self.batch_size,
+                save_predictions=params.get('save_predictions', False))
+            if analysis_result is None:
+                raise Exception(f"Analysis of {log_file} failed")
+
+            with perf_stage('recommendations'):
+                add_recommendations(analysis_result)
+
+            # Compact summaries keep the top alerts; the full entries go next to the summary file
+            summary_file = params.get('summary_file')
+            if params.get('compact'):
+                with perf_stage('compact'):
+                    compact_result(analysis_result,
+                                   entries_file=get_entries_path(summary_file) if summary_file else None,
+                                   top_n=params.get('top_entries') or DEFAULT_TOP_ENTRIES)
+        summary_output = {
+            'file_summaries': [analysis_result],
+            'timestamp': datetime.now().isoformat(),
+            'perf': perf_run.as_dict()
+        }
+
+        # Write the summary where the caller expects it, as run_analysis.py does;
+        # without a path the whole summary is returned inline
+        if not summary_file:
+            return {'summary': summary_output, 'predictions_file': predictions_path}
+
+        write_summary(summary_output, summary_file, indent=params.get('json_indent', DEFAULT_INDENT))
+        return {
+            'summary_file': summary_file,
+            'predictions_file': predictions_path,
+            'total_records': analysis_result['total_records'],
+            'prediction_counts': analysis_result['prediction_counts'],
+        }
+
+    def get_assistant(self, summary_file):
+        """Return a cached assistant for summary_file, reloading it when the file changes"""
+        mtime = os.path.getmtime(summary_file) if summary_file and os.path.exists(summary_file) else None
+        key = (summary_file, mtime)
+        with self.assistants_lock:
+            assistant = self.assistants.get(key)
+            if assistant is not None:
+                self.assistants.move_to_end(key)
+                return assistant
+
+        assistant = RedHawkAssistant(self.api_key, summary_file)
+        with self.assistants_lock:
+            self.assistants[key] = assistant
+            while len(self.assistants) > MAX_CACHED_ASSISTANTS:
+                self.assistants.popitem(last=False)
+        return assistant
+
+    def run_chat(self, params):
+        query = params.get('query')
+        if not query:
+            raise ValueError("'query' is required")
+        assistant = self.get_assistant(params.get('summary_file'))
+        return {'response': assistant.generate_response(query)}
+
+    def run_scan(self, params):
+        url = params.get('url')
+        if not url:
+            raise ValueError("'url' is required")
+        return build_scan_report(url, skip_ai=params.get('skip_ai', False),
+                                 concurrency=params.get('concurrency', DEFAULT_HOST_CONCURRENCY),
+                                 limiter=self.host_limiter)
+
+    def handle_line(self, line, respond):
+        """Parse one request line and submit it"""
+        line = line.strip()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            respond({'id': None, 'ok': False, 'error': f"Invalid request: {str(e)}"})
+            return
+        self.submit(request, respond)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+def make_responder(stream):
+    """Return a thread-safe function that writes one JSON line per response"""
+    lock = threading.Lock()
+
+    def respond(response):
+        line = json.dumps(response, default=str) + "\n"
+        with lock:
+            stream.write(line)
+            stream.flush()
+
+    return respond
+
+class SocketWriter:
+    """Text-mode write() on top of a socket's binary stream"""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text.encode('utf-8'))
+
+    def flush(self):
+        self.stream.flush()
+
+def serve_stdio(worker, protocol_out):
+    """Read requests from stdin and write responses to protocol_out until EOF"""
+    respond = make_responder(protocol_out)
+    print("Analysis worker ready on stdin/stdout", file=sys.stderr)
+
+    for line in sys.stdin:
+        worker.handle_line(line, respond)
+    worker.shutdown()
+
+def serve_socket(worker, socket_path):
+    """Serve requests on a Unix domain socket, one JSON line per request"""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            respond = make_responder(SocketWriter(self.wfile))
+            for raw_line in self.rfile:
+                worker.handle_line(raw_line.decode('utf-8', errors='replace'), respond)
+
+    with socketserver.ThreadingUnixStreamServer(socket_path, RequestHandler) as server:
+        server.daemon_threads = True
+        print(f"Analysis worker listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.shutdown()
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Persistent RedHawk analysis, chat and scan worker')
+    parser.add_argument('--socket', type=str, default=None,
+                        help='Serve on this Unix socket path instead of stdin/stdout')
+    parser.add_argument('--max-concurrency', type=int, default=4,
+                        help='Jobs run at the same time (default: 4)')
+    parser.add_argument('--max-pending', type=int, default=16,
+                        help='Jobs allowed to wait for a free slot before new ones are rejected (default: 16)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Rows scored per model call')
+    parser.add_argument('--api-key', type=str,
+                        default=os.environ.get('GEMINI_API_KEY') or os.environ.get('GITHUB_TOKEN'),
+                        help='Gemini API key for chat jobs (can also be set via GEMINI_API_KEY or GITHUB_TOKEN)')
+    args = parser.parse_args()
+
+    # The pipeline and assistant print progress; keep that off the protocol stream
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    worker = AnalysisWorker(max_concurrency=args.max_concurrency, max_pending=args.max_pending,
+                            api_key=args.api_key, batch_size=args.batch_size)
+
+    if args.socket:
+        serve_socket(worker, args.socket)
+    else:
+        serve_stdio(worker, protocol_out)
+
+if __name__ == "__main__":
+    main()
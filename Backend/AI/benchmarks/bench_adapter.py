@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import argparse
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_analysis_pipeline_adapter import adapt_dataframe
+from synthetic_logs import generate_redhawk_dataset
+
+def legacy_adapt_dataframe(data):
+    """
+    The column construction adapt_dataset used before vectorization
+    """
+    adapted_data = pd.DataFrame()
+    for source, target in [('protocol', 'protocol_type'), ('service', 'service'), ('flag', 'flag'),
+                           ('bytes', 'bytes'), ('duration', 'duration'),
+                           ('src_port', 'src_port'), ('dst_port', 'dst_port')]:
+        adapted_data[target] = data[source]
+    adapted_data['land'] = ((data['src_ip'] == data['dst_ip']) &
+                            (data['src_port'] == data['dst_port'])).astype(int)
+    adapted_data['wrong_fragment'] = 0
+    adapted_data['urgent'] = 0
+    adapted_data['logged_in'] = data['auth_result'].apply(
+        lambda x: 1 if str(x).lower() in ['success', 'successful', 'true', '1'] else 0
+    )
+    for col, value in [('root_shell', 0), ('su_attempted', 0), ('is_host_login', 0), ('is_guest_login', 0),
+                       ('count', 1), ('srv_count', 1), ('serror_rate', 0), ('srv_serror_rate', 0),
+                       ('rerror_rate', 0), ('srv_rerror_rate', 0), ('same_srv_rate', 1),
+                       ('diff_srv_rate', 0), ('srv_diff_host_rate', 0)]:
+        adapted_data[col] = value
+    adapted_data['class'] = data['attack_type'].apply(
+        lambda x: 'normal' if pd.isna(x) or str(x).lower() in ['normal', 'none', 'nan', ''] else 'attack'
+    )
+    for col in data.columns:
+        adapted_data[f'original_{col}'] = data[col]
+    return adapted_data
+
+def time_adapter(adapter, data, repeat):
+    best = None
+    for _ in range(repeat):
+        # The adapters print warnings; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            adapted = adapter(data)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, adapted
+
+def owned_megabytes(adapted, data):
+    """
+    Megabytes held by adapted columns that don't share a buffer with data
+    """
+    source_values = [data[col].to_numpy() for col in data.columns]
+    owned = 0
+    for col in adapted.columns:
+        values = adapted[col].to_numpy()
+        if not any(np.shares_memory(values, source) for source in source_values):
+            owned += values.nbytes
+    return owned / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark adapt_dataset column construction against the row-wise version')
+    parser.add_argument('--rows', type=str, default='1000000,10000000',
+                        help='Comma-separated row counts (default: 1000000,10000000)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per adapter, best time is reported')
+    parser.add_argument('--skip-legacy', action='store_true', help='Only time the vectorized adapter')
+    args = parser.parse_args()
+
+    adapters = [
+        ('vectorized', lambda data: adapt_dataframe(data)),
+        ('no-original', lambda data: adapt_dataframe(data, include_original=False)),
+    ]
+    if not args.skip_legacy:
+        adapters.insert(0, ('legacy', legacy_adapt_dataframe))
+
+    for rows in [int(value) for value in args.rows.split(',')]:
+        data = generate_redhawk_dataset(rows)
+        print(f"{rows} rows, source frame {data.memory_usage(deep=False).sum() / (1024 * 1024):.0f} MB (shallow)")
+
+        results = {}
+        for name, adapter in adapters:
+            elapsed, adapted = time_adapter(adapter, data, args.repeat)
+            results[name] = elapsed
+            print(f"  {name:<12} {elapsed:8.3f}s  {rows / elapsed:12,.0f} rows/s  "
+                  f"new column memory {owned_megabytes(adapted, data):8.0f} MB")
+            del adapted
+
+        if 'legacy' in results:
+            print(f"  Speedup: {results['legacy'] / results['vectorized']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_features import (HOST_WINDOW_CONNECTIONS, REJECT_FLAGS, SYN_ERROR_FLAGS, TIME_WINDOW_SECONDS,
+                                 ConnectionWindows, compute_connection_features)
+from synthetic_logs import generate_redhawk_dataset
+
+def get_connections(data):
+    return pd.DataFrame({
+        'timestamp': data['timestamp'],
+        'dst_host': data['dst_ip'],
+        'service': data['service'],
+        'flag': data['flag'],
+        'src_port': data['src_port']
+    })
+
+def reference_features(connections, time_window=TIME_WINDOW_SECONDS, host_window=HOST_WINDOW_CONNECTIONS):
+    """
+    The features row by row, straight from their definitions, to check the vectorized version
+    """
+    times = pd.to_datetime(connections['timestamp']).to_numpy().astype(np.int64)
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    hosts, services, ports = (connections[name].to_numpy()[order] for name in ['dst_host', 'service', 'src_port'])
+    flags = connections['flag'].to_numpy()[order]
+    syn_errors = np.isin(flags, SYN_ERROR_FLAGS)
+    rejects = np.isin(flags, REJECT_FLAGS)
+
+    rows = []
+    for i in range(len(times)):
+        row = {}
+        start = i
+        while start > 0 and times[start - 1] > times[i] - time_window * 1000000000:
+            start -= 1
+        for prefix, window in [('', range(start, i + 1)), ('dst_host_', range(max(i - host_window + 1, 0), i + 1))]:
+            host = [j for j in window if hosts[j] == hosts[i]]
+            service = [j for j in window if services[j] == services[i]]
+            row[f'{prefix}count'] = len(host)
+            row[f'{prefix}srv_count'] = len(service)
+            row[f'{prefix}serror_rate'] = syn_errors[host].mean()
+            row[f'{prefix}srv_serror_rate'] = syn_errors[service].mean()
+            row[f'{prefix}rerror_rate'] = rejects[host].mean()
+            row[f'{prefix}srv_rerror_rate'] = rejects[service].mean()
+            row[f'{prefix}same_srv_rate'] = np.mean(services[host] == services[i])
+            row[f'{prefix}diff_srv_rate'] = 1 - row[f'{prefix}same_srv_rate']
+            row[f'{prefix}srv_diff_host_rate'] = np.mean(hosts[service] != hosts[i])
+        row['dst_host_same_src_port_rate'] = np.mean(ports[[j for j in range(max(i - host_window + 1, 0), i + 1)
+                                                             if hosts[j] == hosts[i]]] == ports[i])
+        rows.append(row)
+
+    reference = pd.DataFrame(rows)
+    reference.index = connections.index[order]
+    return reference.sort_index()
+
+def check(rows):
+    data = generate_redhawk_dataset(rows, hosts=200, seconds=max(rows // 20, 1)).sample(frac=1, random_state=0)
+    connections = get_connections(data)
+    features = compute_connection_features(connections).sort_index()
+    reference = reference_features(connections)
+    for col in reference.columns:
+        if not np.allclose(features[col].to_numpy(dtype=np.float64), reference[col].to_numpy(dtype=np.float64)):
+            raise Exception(f"{col} differs from the row-by-row definition")
+
+    # Chunks carry windows forward, so they need the log in time order
+    ordered = connections.sort_index()
+    single = compute_connection_features(ordered)
+    windows = ConnectionWindows()
+    chunked = pd.concat([windows(ordered.iloc[start:start + 97]) for start in range(0, rows, 97)])
+    if not np.allclose(chunked.to_numpy(dtype=np.float64), single.to_numpy(dtype=np.float64)):
+        raise Exception("Chunked features differ from a single pass")
+    print(f"Checked {rows} rows against the row-by-row definition, whole and in chunks")
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the windowed connection features')
+    parser.add_argument('--rows', type=str, default='1000000,10000000',
+                        help='Comma-separated row counts (default: 1000000,10000000)')
+    parser.add_argument('--seconds', type=int, default=None,
+                        help='Seconds of log time the rows span (default: 100 connections per second)')
+    parser.add_argument('--check', type=int, default=2000,
+                        help='Rows compared with the row-by-row definition first, 0 to skip (default: 2000)')
+    args = parser.parse_args()
+
+    if args.check:
+        check(args.check)
+
+    for rows in [int(value) for value in args.rows.split(',')]:
+        seconds = args.seconds or max(rows // 100, 1)
+        connections = get_connections(generate_redhawk_dataset(rows, seconds=seconds))
+        start = time.perf_counter()
+        features = compute_connection_features(connections)
+        elapsed = time.perf_counter() - start
+        print(f"{rows} rows over {seconds}s: {elapsed:8.3f}s  {rows / elapsed:12,.0f} rows/s  "
+              f"mean count {features['count'].mean():.1f}, mean dst_host_count {features['dst_host_count'].mean():.1f}")
+        del connections, features
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import pandas as pd
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_encoding import candidate_encodings
+
+LEGACY_ENCODINGS = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']
+
+def write_latin1_log(path, rows, marker_position):
+    """
+    Write a latin1 CSV log whose first non-ASCII byte sits at marker_position
+    (a fraction of the file), the worst case for a decode-and-retry loop
+    """
+    marker_row = int(rows * marker_position)
+    with open(path, 'w', encoding='latin1', newline='') as f:
+        f.write("timestamp,src_ip,dst_ip,dst_port,protocol,user\n")
+        for i in range(rows):
+            user = 'josé' if i == marker_row else 'jose'
+            f.write(f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d},10.0.{i // 256 % 256}.{i % 256},"
+                    f"192.168.1.{i % 50},{(i * 7) % 65535},tcp,{user}\n")
+
+def read_legacy(path):
+    """
+    The retry loop process_log_file used before encoding detection
+    """
+    attempts = 0
+    for encoding in LEGACY_ENCODINGS:
+        attempts += 1
+        try:
+            return pd.read_csv(path, encoding=encoding), encoding, attempts
+        except UnicodeDecodeError:
+            continue
+    raise Exception("Could not read file with any supported encoding")
+
+def read_detected(path):
+    """
+    Sniff once, then read with the detected encoding
+    """
+    attempts = 0
+    for encoding in candidate_encodings(path):
+        attempts += 1
+        try:
+            return pd.read_csv(path, encoding=encoding), encoding, attempts
+        except UnicodeDecodeError:
+            continue
+    raise Exception("Could not read file with any supported encoding")
+
+def time_reader(reader, path, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df, encoding, attempts = reader(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, encoding, attempts, len(df)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark encoding detection against the legacy retry loop')
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows in the generated log')
+    parser.add_argument('--marker-position', type=float, default=0.5,
+                        help='Where the first non-ASCII byte appears, as a fraction of the file (default: 0.5)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per reader, best time is reported')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'latin1_log.csv')
+        write_latin1_log(path, args.rows, args.marker_position)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Generated {args.rows} rows ({size_mb:.1f} MB), non-ASCII byte at {args.marker_position:.0%}")
+
+        results = {}
+        for name, reader in [('legacy', read_legacy), ('detected', read_detected)]:
+            elapsed, encoding, attempts, rows = time_reader(reader, path, args.repeat)
+            results[name] = elapsed
+            print(f"  {name:<9} {elapsed:8.3f}s  encoding={encoding}  parse attempts={attempts}  rows={rows}")
+
+        print(f"Speedup: {results['legacy'] / results['detected']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_signatures import build_body
+from response_fingerprint import DEFAULT_SIMILARITY_THRESHOLD, ResponseFingerprint
+
+def legacy_differs(baseline_response, response_content, threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """The word-set comparison scan_website ran for every payload before fingerprints"""
+    if baseline_response and response_content:
+        common_words = set(baseline_response.lower().split()) & set(response_content.lower().split())
+        total_words = len(set(baseline_response.lower().split()) | set(response_content.lower().split()))
+        if total_words > 0:
+            return len(common_words) / total_words < threshold
+    return False
+
+def build_probes(baseline, count, seed=0):
+    """Probe bodies with a growing share of the baseline's words replaced, around the threshold and past it"""
+    rng = random.Random(seed)
+    words = baseline.split()
+    probes = []
+    for i in range(count):
+        share = i / max(count - 1, 1) * 0.6
+        changed = [word if rng.random() >= share else f"new{rng.randrange(100000)}" for word in words]
+        probes.append(' '.join(changed))
+    return probes
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare cached baseline fingerprints with the per-payload word-set comparison')
+    parser.add_argument('--sizes', type=str, default='10000,1000000',
+                        help='Comma-separated response body sizes in characters (default: 10000,1000000)')
+    parser.add_argument('--probes', type=int, default=10, help='Probes compared with each baseline (default: 10)')
+    args = parser.parse_args()
+
+    for size in [int(value) for value in args.sizes.split(',')]:
+        baseline = build_body(size)
+        # Few distinct words, so the probes' replacements actually move the similarity
+        baseline = ' '.join(baseline.split()[:size // 50] * 10)
+        probes = build_probes(baseline, args.probes) + ['', baseline.upper()]
+
+        start = time.perf_counter()
+        legacy = [legacy_differs(baseline, probe) for probe in probes]
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fingerprint = ResponseFingerprint(baseline)
+        current = [fingerprint.differs(probe) for probe in probes]
+        current_seconds = time.perf_counter() - start
+
+        if current != legacy:
+            raise Exception(f"Fingerprint verdicts differ from the word-set comparison on {size} character bodies")
+        print(f"{size:>9} chars, {len(probes)} probes ({sum(current)} changed): legacy {legacy_seconds * 1000:9.2f} ms  "
+              f"fingerprint {current_seconds * 1000:9.2f} ms  {legacy_seconds / current_seconds:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import random
+import string
+import argparse
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scan_signatures import SQL_ERROR_SIGNATURES, SignatureMatcher, ahocorasick
+
+def legacy_error_detected(response_content, signatures):
+    """The SQL error check scan_website ran before the signature matcher"""
+    return any(error.lower() in response_content.lower() for error in signatures)
+
+def build_body(size, seed=0):
+    """An HTML-ish page of size characters with no signature in it"""
+    rng = random.Random(seed)
+    words = [''.join(rng.choices(string.ascii_letters, k=rng.randint(2, 9))) for _ in range(5000)]
+    body = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        body.append(word)
+        length += len(word) + 1
+    return ('<html><body>' + ' '.join(body))[:size]
+
+def extra_signatures(count, seed=1):
+    rng = random.Random(seed)
+    return [f"ERR-{i:04d} " + ''.join(rng.choices(string.ascii_lowercase, k=8)) for i in range(count)]
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the SQL error signature check with the one it replaced')
+    parser.add_argument('--sizes', type=str, default='10000,1000000,5000000',
+                        help='Comma-separated response body sizes in characters (default: 10000,1000000,5000000)')
+    parser.add_argument('--extra', type=str, default='0,200',
+                        help='Comma-separated counts of extra signatures, as from signature files (default: 0,200)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per check, best time is reported')
+    args = parser.parse_args()
+
+    print(f"Aho-Corasick automaton: {'available' if ahocorasick is not None else 'not installed (pip install pyahocorasick)'}")
+    for extra in [int(value) for value in args.extra.split(',')]:
+        signatures = SQL_ERROR_SIGNATURES + extra_signatures(extra)
+        start = time.perf_counter()
+        matcher = SignatureMatcher(signatures)
+        compile_ms = (time.perf_counter() - start) * 1000
+        print(f"{len(signatures)} signatures ({len(matcher.needles)} after pruning, "
+              f"{'automaton' if matcher.automaton is not None else 'substring search'}), compiled in {compile_ms:.2f} ms")
+
+        for size in [int(value) for value in args.sizes.split(',')]:
+            body = build_body(size)
+            for case, text in [('miss', body), ('hit at end', body + ' You have an error in your SQL syntax')]:
+                legacy, legacy_result = best_time(lambda: legacy_error_detected(text, signatures), args.repeat)
+                current, result = best_time(lambda: matcher.search(text) is not None, args.repeat)
+                if result != legacy_result:
+                    raise Exception(f"Matcher disagrees with the legacy check on a {size} character body ({case})")
+                print(f"  {size:>9} chars {case:<10}  legacy {legacy * 1000:9.2f} ms  "
+                      f"matcher {current * 1000:8.2f} ms  {legacy / current:6.1f}x")
+
+if __name__ == "__main__":
+    main()
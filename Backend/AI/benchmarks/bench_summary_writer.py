@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_summary_generator import add_recommendations, analyze_predictions
+from summary_writer import write_summary
+from synthetic_logs import generate_redhawk_dataset
+
+CATEGORIES = ['normal', 'probe', 'attack', 'anomaly']
+
+def build_summary(rows):
+    """
+    A run_analysis-style summary of rows synthetic scored log rows
+    """
+    df = generate_redhawk_dataset(rows)
+    rng = np.random.default_rng(0)
+    df['predicted_category'] = np.asarray(CATEGORIES, dtype=object)[rng.choice(len(CATEGORIES), rows, p=[0.6, 0.2, 0.15, 0.05])]
+    for category in CATEGORIES:
+        df[f'prob_{category}'] = rng.random(rows)
+    result, _ = analyze_predictions(df)
+    add_recommendations(result)
+    return {'file_summaries': [result], 'timestamp': pd.Timestamp.now().isoformat()}
+
+def legacy_write(summary, path):
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+WRITERS = [
+    ('json.dump indent=2', '.json', legacy_write),
+    ('streaming indent=2', '.json', lambda summary, path: write_summary(summary, path, indent=2)),
+    ('streaming compact', '.json', lambda summary, path: write_summary(summary, path, indent=None)),
+    ('streaming indent=2 gz', '.json.gz', lambda summary, path: write_summary(summary, path, indent=2)),
+    ('streaming compact gz', '.json.gz', lambda summary, path: write_summary(summary, path, indent=None)),
+]
+
+def measure(write, summary, path):
+    """
+    Seconds to write, then the peak Python memory allocated while writing again
+    """
+    start = time.perf_counter()
+    write(summary, path)
+    seconds = time.perf_counter() - start
+    # tracemalloc slows the writer down, so memory gets its own run
+    tracemalloc.start()
+    write(summary, path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the summary JSON writers by time, memory and file size')
+    parser.add_argument('--rows', type=str, default='100000,1000000',
+                        help='Comma-separated row counts (default: 100000,1000000)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in [int(value) for value in args.rows.split(',')]:
+            summary = build_summary(rows)
+            print(f"{rows} rows")
+            for name, extension, write in WRITERS:
+                path = os.path.join(work_dir, f"summary{extension}")
+                seconds, peak_mb = measure(write, summary, path)
+                print(f"  {name:<22} {seconds:8.3f}s  peak alloc {peak_mb:8.1f} MB  "
+                      f"size {os.path.getsize(path) / (1024 * 1024):8.1f} MB")
+            del summary
+
+if __name__ == "__main__":
+    main()
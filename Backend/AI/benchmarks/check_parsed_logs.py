@@ -0,0 +1,56 @@
+import os
+import sys
+import shutil
+import tempfile
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_analysis_pipeline import load_default_model, process_log_file, score_log_file
+from log_analysis_pipeline_adapter import adapt_dataframe
+from log_formats import read_table
+from log_parsers import LOG_PARSERS
+from synthetic_logs import generate_log_lines, generate_redhawk_dataset
+
+def missing_features(data, model_components):
+    """The model's continuous and symbolic features that data has no column for"""
+    features = model_components.get('continuous_features', []) + model_components.get('symbolic_features', [])
+    return sorted(name for name in features if name not in data.columns)
+
+def check_parsed_logs(rows=5000, chunk_size=1500):
+    """
+    Syslog, access and NDJSON logs must reach the model adapted, missing no
+    more features than an adapted redhawk_dataset CSV, with the same
+    predictions whether they are scored whole or in chunks
+    """
+    model_components = load_default_model()
+    if model_components is None:
+        raise Exception("Could not load the bundled model")
+    expected = missing_features(adapt_dataframe(generate_redhawk_dataset(rows), verbose=False), model_components)
+
+    work_dir = tempfile.mkdtemp(prefix='redhawk_check_parsed_')
+    try:
+        for log_format in LOG_PARSERS:
+            file_path = os.path.join(work_dir, f"{log_format}.log")
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(generate_log_lines(log_format, rows)) + '\n')
+
+            scored = score_log_file(file_path, model_components)
+            missing = missing_features(scored, model_components)
+            if missing != expected:
+                raise Exception(f"{log_format} log is missing {len(missing)} features, expected {len(expected)}: "
+                                f"{sorted(set(missing) - set(expected))}")
+
+            chunked = read_table(process_log_file(file_path, model_components, chunk_size=chunk_size,
+                                                  output_dir=work_dir))
+            if chunked['predicted_class'].tolist() != scored['predicted_class'].tolist():
+                raise Exception(f"{log_format} log scored in chunks of {chunk_size} differs from scoring it whole")
+            print(f"Checked {rows} {log_format} lines: adapted before scoring, {len(missing)} features missing")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def main():
+    check_parsed_logs()
+
+if __name__ == "__main__":
+    main()
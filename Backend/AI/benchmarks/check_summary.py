@@ -0,0 +1,112 @@
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_analysis_pipeline import add_prediction_columns
+from log_analysis_pipeline_adapter import adapt_dataframe
+from log_summary_generator import (add_recommendations, analyze_predictions, analyze_prediction_file,
+                                   find_columns, summarize_prediction_chunks, summary_from_aggregate)
+from synthetic_logs import generate_redhawk_dataset
+
+# The bundled model's classes, in predict_proba column order
+MODEL_CLASSES = ['dos', 'normal', 'probe', 'r2l', 'u2r']
+
+def score_as(data, classes, seed=0):
+    """
+    Add prediction columns as if the model had picked classes[i] for row i
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = rng.random((len(data), len(MODEL_CLASSES))) * 0.3
+    probabilities[np.arange(len(data)), [MODEL_CLASSES.index(name) for name in classes]] = 0.95
+    add_prediction_columns(data, probabilities, MODEL_CLASSES)
+    return data
+
+def check_attack_classes(rows=1000):
+    """A log scored mostly as dos, r2l and u2r must come out as alerts and a critical summary"""
+    rng = np.random.default_rng(1)
+    classes = rng.choice(MODEL_CLASSES, rows, p=[0.7, 0.1, 0.1, 0.05, 0.05])
+    data = score_as(generate_redhawk_dataset(rows), classes)
+    attacks = int(np.isin(classes, ['dos', 'r2l', 'u2r']).sum())
+
+    if (data['predicted_class'].to_numpy() != classes).any():
+        raise Exception("predicted_class does not keep the model's class")
+    result, aggregate = analyze_predictions(data)
+    if result['prediction_counts'].get('attack') != attacks:
+        raise Exception(f"Expected {attacks} attack predictions, got {result['prediction_counts']}")
+    if aggregate['status_counts'].get('ALERT') != attacks:
+        raise Exception(f"Expected {attacks} alerts, got {aggregate['status_counts']}")
+
+    for summary in [add_recommendations(result), summary_from_aggregate(aggregate)]:
+        if 'status is critical' not in summary['text_summary']:
+            raise Exception(f"Attack-heavy log not summarized as critical: {summary['text_summary']}")
+        if not any('attack' in action for action in summary['recommended_actions']):
+            raise Exception(f"No attack action recommended: {summary['recommended_actions']}")
+    print(f"Checked {rows} rows: {attacks} dos/r2l/u2r predictions are attack alerts")
+
+def check_port_analysis(rows=2000):
+    """port_analysis counts port numbers only, not the adapter's dst_host_same_src_port_rate"""
+    data = adapt_dataframe(generate_redhawk_dataset(rows), verbose=False)
+    data = score_as(data, ['normal'] * rows)
+    result, _ = analyze_predictions(data)
+    ports = result.get('port_analysis', {})
+    not_ports = [port for port in ports if not port.isdigit()]
+    if not ports or not_ports:
+        raise Exception(f"port_analysis has {len(ports)} keys, of which not ports: {not_ports[:5]}")
+    print(f"Checked {rows} adapted rows: {len(ports)} port_analysis keys, all port numbers")
+
+def check_port_columns():
+    """
+    Port columns are found by substring, as before, except for the *_rate features
+    """
+    columns = ['src_port', 'dst_port', 'port_number', 'port_src', 'Port', 'dst_host_same_src_port_rate',
+               'dst_host_srv_count', 'protocol_type']
+    # Before: every column containing 'port'; after: the same, less the rate
+    before = [col for col in columns if 'port' in col.lower()]
+    expected = [col for col in before if col != 'dst_host_same_src_port_rate']
+    found = find_columns(columns)['port']
+    if found != expected:
+        raise Exception(f"Port columns {found}, expected {expected}")
+    print(f"Checked port columns: {found}, without dst_host_same_src_port_rate")
+
+def check_chunked_summary(chunk_size=300):
+    """
+    Summarizing in chunks without top_n gives the in-memory summary: the same
+    keys in the same order, and tied categories in value_counts() order
+    """
+    # attack, probe and normal all tie at 150, but the first chunk alone ranks them attack, normal, probe
+    classes = ['probe'] + ['dos'] * 150 + ['probe'] * 49 + ['normal'] * 100 + ['probe'] * 100 + ['normal'] * 50
+    data = score_as(generate_redhawk_dataset(len(classes)), classes)
+    work_dir = tempfile.mkdtemp(prefix='redhawk_check_summary_')
+    try:
+        predictions_file = os.path.join(work_dir, 'tied_predictions.csv')
+        data.to_csv(predictions_file, index=False)
+        expected = add_recommendations(analyze_prediction_file(predictions_file))
+        chunked = summarize_prediction_chunks(predictions_file, chunk_size, os.path.join(work_dir, 'entries.ndjson'))
+        chunked['log_entries'] = [entry for batch in chunked['log_entries'] for entry in batch]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if list(chunked) != list(expected):
+        raise Exception(f"Chunked summary keys {list(chunked)} differ from {list(expected)}")
+    if list(chunked['prediction_counts'].items()) != list(expected['prediction_counts'].items()):
+        raise Exception(f"Chunked prediction_counts {chunked['prediction_counts']} "
+                        f"not ordered as {expected['prediction_counts']}")
+    for key in expected:
+        if chunked[key] != expected[key]:
+            raise Exception(f"Chunked summary differs on {key}")
+    print(f"Checked {len(classes)} rows in chunks of {chunk_size}: "
+          f"summary matches in memory, ties ordered {list(expected['prediction_counts'])}")
+
+def main():
+    check_attack_classes()
+    check_port_analysis()
+    check_port_columns()
+    check_chunked_summary()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+import multiprocessing
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_DIR = os.path.dirname(BENCHMARKS_DIR)
+BACKEND_DIR = os.path.dirname(AI_DIR)
+
+# Make the AI modules and run_analysis importable when run as a script
+sys.path.append(AI_DIR)
+sys.path.append(BACKEND_DIR)
+
+from synthetic_logs import write_redhawk_dataset
+
+DEFAULT_SIZES = '10000,1000000,10000000'
+STAGES = ['adapt_dataset', 'process_log_file', 'analyze_prediction_file', 'run_analysis']
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB, or None where unsupported
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_adapt_dataset(files, work_dir):
+    from log_analysis_pipeline_adapter import adapt_dataset
+    start_time = time.perf_counter()
+    files['adapted'] = adapt_dataset(files['source'], output_dir=work_dir)
+    seconds = time.perf_counter() - start_time
+    if not files['adapted']:
+        raise Exception("adapt_dataset failed")
+    return seconds
+
+def run_process_log_file(files, work_dir):
+    from log_analysis_pipeline import load_default_model, process_log_file
+    # The model load is not part of the stage; run_analysis covers it end to end
+    model_components = load_default_model()
+    start_time = time.perf_counter()
+    files['predictions'] = process_log_file(files['adapted'], model_components)
+    seconds = time.perf_counter() - start_time
+    if not files['predictions']:
+        raise Exception("process_log_file failed")
+    return seconds
+
+def run_analyze_prediction_file(files, work_dir):
+    from log_summary_generator import analyze_prediction_file
+    start_time = time.perf_counter()
+    result = analyze_prediction_file(files['predictions'])
+    seconds = time.perf_counter() - start_time
+    if not result:
+        raise Exception("analyze_prediction_file failed")
+    return seconds
+
+def run_run_analysis(files, work_dir):
+    import run_analysis
+    # The synthetic input is the same every run, so a cached result would be timed instead
+    sys.argv = ['run_analysis.py', '--log-file', files['adapted'],
+                '--summary-file', os.path.join(work_dir, 'summary.json'), '--no-cache']
+    start_time = time.perf_counter()
+    run_analysis.main()
+    return time.perf_counter() - start_time
+
+STAGE_RUNNERS = {
+    'adapt_dataset': run_adapt_dataset,
+    'process_log_file': run_process_log_file,
+    'analyze_prediction_file': run_analyze_prediction_file,
+    'run_analysis': run_run_analysis,
+}
+
+def stage_worker(stage, files, work_dir, verbose, queue):
+    """
+    Run one stage in a fresh process so its peak RSS is its own
+    """
+    try:
+        if verbose:
+            seconds = STAGE_RUNNERS[stage](files, work_dir)
+        else:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+                    contextlib.redirect_stderr(devnull):
+                seconds = STAGE_RUNNERS[stage](files, work_dir)
+        queue.put({'seconds': seconds, 'peak_rss_mb': peak_rss_mb(), 'files': files})
+    except BaseException as e:
+        queue.put({'error': f"{type(e).__name__}: {e}", 'peak_rss_mb': peak_rss_mb(), 'files': files})
+
+def run_stage(stage, files, work_dir, verbose=False):
+    """
+    Run a stage in a spawned process and return its measurements
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=stage_worker, args=(stage, files, work_dir, verbose, queue))
+    process.start()
+    process.join()
+    if queue.empty():
+        # Killed before it could report, usually by the OOM killer
+        return {'error': f"process exited with code {process.exitcode}"}
+    outcome = queue.get()
+    files.update(outcome.pop('files'))
+    return outcome
+
+def run_benchmarks(sizes, stages, work_dir, verbose=False):
+    results = []
+    for rows in sizes:
+        size_dir = os.path.join(work_dir, f"rows_{rows}")
+        os.makedirs(size_dir, exist_ok=True)
+        source = os.path.join(size_dir, 'redhawk_dataset_synthetic.csv')
+        print(f"Generating {rows} rows...")
+        write_redhawk_dataset(source, rows)
+        files = {'source': source}
+
+        for stage in stages:
+            result = {'rows': rows, 'stage': stage}
+            # Later stages read what earlier ones wrote
+            missing = [key for key, needed_by in [('adapted', ['process_log_file', 'run_analysis']),
+                                                  ('predictions', ['analyze_prediction_file'])]
+                       if stage in needed_by and not files.get(key)]
+            if missing:
+                result['error'] = f"skipped, no {missing[0]} file"
+            else:
+                result.update(run_stage(stage, files, size_dir, verbose))
+                if 'seconds' in result:
+                    result['seconds'] = round(result['seconds'], 4)
+                    result['rows_per_second'] = round(rows / result['seconds']) if result['seconds'] > 0 else None
+            results.append(result)
+            print_result(result)
+    return results
+
+def print_result(result):
+    if 'error' in result:
+        print(f"  {result['stage']:<24} {result['rows']:>10}  ERROR {result['error']}")
+    else:
+        print(f"  {result['stage']:<24} {result['rows']:>10}  {result['seconds']:9.3f}s  "
+              f"{result['rows_per_second'] or 0:>12,} rows/s  peak RSS {result['peak_rss_mb']} MB")
+
+def machine_info():
+    return {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Print each result's time against the baseline; returns the regressions
+    """
+    baseline_times = {(r['rows'], r['stage']): r['seconds'] for r in baseline.get('results', []) if 'seconds' in r}
+    regressions = []
+    print(f"\nComparison with baseline from {baseline.get('created', 'unknown date')}:")
+    for result in results:
+        key = (result['rows'], result['stage'])
+        if key not in baseline_times or 'seconds' not in result:
+            continue
+        ratio = result['seconds'] / baseline_times[key] if baseline_times[key] > 0 else float('inf')
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(result)
+        print(f"  {result['stage']:<24} {result['rows']:>10}  {baseline_times[key]:9.3f}s -> {result['seconds']:9.3f}s  "
+              f"({ratio:.2f}x){'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the AI pipeline stages on synthetic redhawk_dataset logs')
+    parser.add_argument('--sizes', type=str, default=DEFAULT_SIZES,
+                        help=f'Comma-separated row counts (default: {DEFAULT_SIZES})')
+    parser.add_argument('--stages', type=str, default=','.join(STAGES),
+                        help=f"Comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument('--output', type=str, default=None,
+                        help='Results JSON path (default: results/benchmark_<timestamp>.json)')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE,
+                        help='Baseline JSON to compare against (default: baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Also write these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Slowdown over the baseline reported as a regression (default: 0.25 = 25%%)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on any regression')
+    parser.add_argument('--work-dir', type=str, default=None,
+                        help='Keep generated and intermediate files here instead of a temporary directory')
+    parser.add_argument('--verbose', action='store_true', help='Show the pipeline output of each stage')
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(',')]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = [stage for stage in stages if stage not in STAGE_RUNNERS]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        results = run_benchmarks(sizes, stages, args.work_dir, args.verbose)
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run_benchmarks(sizes, stages, work_dir, args.verbose)
+
+    report = {
+        'created': datetime.now().isoformat(),
+        'machine': machine_info(),
+        'results': results,
+    }
+
+    output_path = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {output_path}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+    elif not args.save_baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+# Make the AI modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_formats import TABLE_FORMATS, ChunkedTableWriter
+
+PROTOCOLS = ['tcp', 'udp', 'icmp']
+SERVICES = ['http', 'https', 'ssh', 'ftp', 'smtp', 'domain_u', 'private', 'telnet']
+FLAGS = ['SF', 'S0', 'REJ', 'RSTO', 'SH']
+AUTH_RESULTS = ['success', 'failure', 'Success', 'FAILED', 'true', 'none']
+ATTACK_TYPES = ['dos', 'probe', 'r2l', 'u2r', 'portscan', 'bruteforce']
+
+START_TIME = '2024-01-01'
+SPAN_SECONDS = 7 * 24 * 3600
+
+def generate_redhawk_dataset(rows, attack_ratio=0.2, hosts=5000, seed=0, start=START_TIME, seconds=SPAN_SECONDS):
+    """
+    Generate a DataFrame shaped like redhawk_dataset_2.csv
+
+    Every column is drawn from a small vocabulary, like real network logs, and
+    about attack_ratio of the rows carry an attack_type. Timestamps are sorted
+    and fall within seconds of start.
+    """
+    rng = np.random.default_rng(seed)
+
+    def choice(values, p=None):
+        # Draw from an object array so rows share the vocabulary's string objects
+        return np.asarray(values, dtype=object)[rng.choice(len(values), rows, p=p)]
+
+    def ips(prefix, count):
+        return choice([f"{prefix}{i // 256 % 256}.{i % 256}" for i in range(count)])
+
+    is_normal = rng.random(rows) >= attack_ratio
+    attack_type = np.where(is_normal, choice(['normal', None], p=[0.7, 0.3]), choice(ATTACK_TYPES))
+
+    # Timestamps at one-second resolution, in order
+    span = pd.date_range(start, periods=seconds, freq='s').strftime('%Y-%m-%d %H:%M:%S')
+    timestamps = np.asarray(span, dtype=object)[np.sort(rng.integers(0, len(span), rows))]
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'src_ip': ips('10.0.', hosts),
+        'dst_ip': ips('192.168.', max(hosts // 20, 1)),
+        'src_port': rng.integers(1024, 65536, rows),
+        'dst_port': rng.choice([22, 25, 53, 80, 443, 3306, 8080], rows),
+        'protocol': choice(PROTOCOLS, p=[0.8, 0.15, 0.05]),
+        'service': choice(SERVICES),
+        'flag': choice(FLAGS, p=[0.75, 0.1, 0.08, 0.04, 0.03]),
+        'bytes': rng.integers(0, 100000, rows),
+        'duration': rng.exponential(2.0, rows).round(3),
+        'auth_result': choice(AUTH_RESULTS),
+        'attack_type': attack_type,
+    })
+
+def write_redhawk_dataset(file_path, rows, chunk_rows=1000000, attack_ratio=0.2, seed=0):
+    """
+    Write a synthetic redhawk_dataset file of any size in chunks of chunk_rows
+
+    Each chunk covers its own slice of the time span, so timestamps stay in
+    order across the whole file. The format follows the file extension.
+    """
+    chunks = max((rows + chunk_rows - 1) // chunk_rows, 1)
+    chunk_seconds = max(SPAN_SECONDS // chunks, 1)
+    start = pd.Timestamp(START_TIME)
+
+    with ChunkedTableWriter(file_path) as writer:
+        for i in range(chunks):
+            chunk_size = min(chunk_rows, rows - i * chunk_rows)
+            chunk_start = start + pd.Timedelta(seconds=i * chunk_seconds)
+            writer.write(generate_redhawk_dataset(chunk_size, attack_ratio=attack_ratio, seed=seed + i,
+                                                  start=chunk_start, seconds=chunk_seconds))
+    return file_path
+
+SYSLOG_MESSAGES = [
+    'Failed password for root from {ip} port {port} ssh2',
+    'Accepted publickey for deploy from {ip} port {port} ssh2',
+    'Invalid user admin from {ip} port {port}',
+    'pam_unix(sshd:session): session opened for user deploy by (uid=0)',
+    'Connection closed by {ip} port {port} [preauth]',
+]
+HTTP_REQUESTS = ['GET / HTTP/1.1', 'GET /login HTTP/1.1', 'POST /login HTTP/1.1', 'GET /static/app.js HTTP/1.1',
+                 "GET /search?q=' OR 1=1-- HTTP/1.1", 'GET /admin HTTP/1.0']
+HTTP_STATUSES = [200, 200, 200, 301, 401, 403, 404, 500]
+
+def generate_log_lines(log_format, rows, seed=0, seconds=SPAN_SECONDS):
+    """
+    Generate raw log lines in a format log_parsers.py reads: 'syslog',
+    'access' (combined access log) or 'ndjson'
+    """
+    data = generate_redhawk_dataset(rows, seed=seed, seconds=seconds)
+    rng = np.random.default_rng(seed)
+    timestamps = pd.to_datetime(data['timestamp'])
+
+    if log_format == 'syslog':
+        stamps = timestamps.dt.strftime('%b %d %H:%M:%S')
+        templates = np.asarray(SYSLOG_MESSAGES, dtype=object)[rng.choice(len(SYSLOG_MESSAGES), rows)]
+        pids = rng.integers(1000, 30000, rows)
+        return [f"{stamp} web{pid % 4} sshd[{pid}]: {template.format(ip=ip, port=port)}"
+                for stamp, pid, template, ip, port
+                in zip(stamps, pids, templates, data['src_ip'], data['src_port'])]
+    if log_format == 'access':
+        stamps = timestamps.dt.strftime('%d/%b/%Y:%H:%M:%S +0000')
+        requests = np.asarray(HTTP_REQUESTS, dtype=object)[rng.choice(len(HTTP_REQUESTS), rows)]
+        statuses = np.asarray(HTTP_STATUSES)[rng.choice(len(HTTP_STATUSES), rows)]
+        return [f'{ip} - - [{stamp}] "{request}" {status} {size} "-" "Mozilla/5.0"'
+                for ip, stamp, request, status, size in zip(data['src_ip'], stamps, requests, statuses, data['bytes'])]
+    if log_format == 'ndjson':
+        return data.to_json(orient='records', lines=True).splitlines()
+    raise ValueError(f"Unknown log format: {log_format}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic redhawk_dataset log for benchmarks')
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows to generate (default: 1000000)')
+    parser.add_argument('--output', type=str, default='redhawk_dataset_synthetic.csv',
+                        help=f"Output file; the extension picks the format ({', '.join(TABLE_FORMATS.values())})")
+    parser.add_argument('--attack-ratio', type=float, default=0.2, help='Fraction of rows with an attack_type')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    write_redhawk_dataset(args.output, args.rows, attack_ratio=args.attack_ratio, seed=args.seed)
+    print(f"Wrote {args.rows} rows to {args.output} ({os.path.getsize(args.output) / (1024 * 1024):.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+
+# The KDD traffic features look back this many seconds from each connection
+TIME_WINDOW_SECONDS = 2
+
+# and the dst_host_* features this many connections
+HOST_WINDOW_CONNECTIONS = 100
+
+# Connection flags counted as SYN errors and as rejected connections
+SYN_ERROR_FLAGS = ['S0', 'S1', 'S2', 'S3']
+REJECT_FLAGS = ['REJ']
+
+# Neutral values for logs without destination hosts or timestamps: each
+# connection is the only one in its window
+TIME_WINDOW_DEFAULTS = {
+    'count': 1,
+    'srv_count': 1,
+    'serror_rate': 0,
+    'srv_serror_rate': 0,
+    'rerror_rate': 0,
+    'srv_rerror_rate': 0,
+    'same_srv_rate': 1,
+    'diff_srv_rate': 0,
+    'srv_diff_host_rate': 0
+}
+
+HOST_WINDOW_DEFAULTS = {
+    'dst_host_count': 1,
+    'dst_host_srv_count': 1,
+    'dst_host_same_srv_rate': 1,
+    'dst_host_diff_srv_rate': 0,
+    'dst_host_same_src_port_rate': 1,
+    'dst_host_srv_diff_host_rate': 0,
+    'dst_host_serror_rate': 0,
+    'dst_host_srv_serror_rate': 0,
+    'dst_host_rerror_rate': 0,
+    'dst_host_srv_rerror_rate': 0
+}
+
+# Columns of the frame passed to compute_connection_features
+CONNECTION_COLUMNS = ['timestamp', 'dst_host', 'service', 'flag', 'src_port']
+
+def group_codes(*columns):
+    """
+    Dense integer code for each distinct combination of values, missing values included
+    """
+    codes = None
+    for column in columns:
+        column_codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        column_codes = column_codes.astype(np.int64)
+        if codes is None:
+            codes = column_codes
+        else:
+            codes = pd.factorize(codes * len(uniques) + column_codes)[0].astype(np.int64)
+    return codes
+
+class GroupWindows:
+    """
+    Sliding windows over the rows of each group
+
+    Rows are in time order and keys never decrease along them. The window of
+    a row holds the rows of its group, up to and including itself, whose key
+    is at least the row's lower key. Sorting the rows by group (stably, so
+    time order is kept within a group) makes every window a contiguous run,
+    found with one searchsorted over group * span + key; window sums are
+    then differences of a cumulative sum. Both are O(n log n) at worst.
+    """
+    def __init__(self, codes, keys, lower, span):
+        # numpy's stable sort is a linear radix sort for 16-bit integers
+        narrow = codes.astype(np.uint16) if len(codes) and codes.max() < 65536 else codes
+        self.order = np.argsort(narrow, kind='stable')
+        base = codes[self.order] * span
+        sorted_keys = base + keys[self.order]
+        self.starts = np.searchsorted(sorted_keys, base + lower[self.order], side='left')
+        self.ends = np.arange(1, len(codes) + 1)
+
+    def unsort(self, values):
+        result = np.empty_like(values)
+        result[self.order] = values
+        return result
+
+    def count(self):
+        """Rows in each row's window"""
+        return self.unsort(self.ends - self.starts)
+
+    def sum(self, mask):
+        """Rows in each row's window where mask is set"""
+        cumulative = np.concatenate(([0], np.cumsum(mask[self.order], dtype=np.int64)))
+        return self.unsort(cumulative[self.ends] - cumulative[self.starts])
+
+def window_features(hosts, services, syn_errors, rejects, keys, lower, span, src_ports=None):
+    """
+    Same-host and same-service counts and rates over one kind of window
+
+    Returns arrays named after the time-window features; with src_ports the
+    share of same-host connections from the same source port is added.
+    """
+    host_windows = GroupWindows(hosts, keys, lower, span)
+    service_windows = GroupWindows(services, keys, lower, span)
+    host_count = host_windows.count()
+    service_count = service_windows.count()
+    same_service = GroupWindows(group_codes(hosts, services), keys, lower, span).count() / host_count
+    # Connections to the host over the service are a subset of both windows
+    same_service_host = same_service * host_count / service_count
+
+    features = {
+        'count': host_count,
+        'srv_count': service_count,
+        'serror_rate': host_windows.sum(syn_errors) / host_count,
+        'srv_serror_rate': service_windows.sum(syn_errors) / service_count,
+        'rerror_rate': host_windows.sum(rejects) / host_count,
+        'srv_rerror_rate': service_windows.sum(rejects) / service_count,
+        'same_srv_rate': same_service,
+        'diff_srv_rate': 1 - same_service,
+        'srv_diff_host_rate': 1 - same_service_host
+    }
+    if src_ports is not None:
+        features['same_src_port_rate'] = GroupWindows(group_codes(hosts, src_ports), keys, lower, span).count() / host_count
+    return features
+
+def parse_timestamps(values):
+    """
+    Timestamps as int64 nanoseconds, with gaps filled from neighbouring rows, or None
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        timestamps = pd.to_datetime(values, unit='s', errors='coerce')
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        timestamps = pd.Series(values)
+    else:
+        timestamps = pd.to_datetime(values, errors='coerce')
+    if isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+        timestamps = timestamps.dt.tz_convert(None)
+    timestamps = pd.Series(timestamps).ffill().bfill()
+    if timestamps.isna().all():
+        return None
+    return timestamps.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+def compute_connection_features(connections, time_window=TIME_WINDOW_SECONDS, host_window=HOST_WINDOW_CONNECTIONS,
+                                verbose=True):
+    """
+    KDD traffic features of each connection from the connections around it
+
+    connections has the CONNECTION_COLUMNS. The time-window features (count,
+    serror_rate, ...) look at connections in the time_window seconds up to
+    each one, by destination host and by service; the dst_host_* features
+    look at the last host_window connections. Ties in time keep file order,
+    so a connection never sees the ones logged after it. Without timestamps
+    the host window follows file order and the time-window features get
+    neutral values. Returns a DataFrame with the connections' index.
+    """
+    rows = len(connections)
+    features = pd.DataFrame(index=connections.index)
+    if rows == 0 or 'dst_host' not in connections.columns:
+        if verbose and rows:
+            print("Warning: No destination host column, using neutral values for the connection features")
+        for col, value in {**TIME_WINDOW_DEFAULTS, **HOST_WINDOW_DEFAULTS}.items():
+            features[col] = value
+        return features
+
+    timestamps = parse_timestamps(connections['timestamp']) if 'timestamp' in connections.columns else None
+    # Work in time order and put the results back in file order at the end
+    order = np.argsort(timestamps, kind='stable') if timestamps is not None else np.arange(rows)
+
+    def ordered(name):
+        return connections[name].to_numpy()[order]
+
+    hosts = group_codes(ordered('dst_host'))
+    services = group_codes(ordered('service'))
+    # Flags have a handful of distinct values, so match those rather than every row
+    flag_codes, flag_values = pd.factorize(connections['flag'].to_numpy()[order], use_na_sentinel=False)
+    flag_values = pd.Index(flag_values).astype(str).str.upper()
+    syn_errors = flag_values.isin(SYN_ERROR_FLAGS)[flag_codes]
+    rejects = flag_values.isin(REJECT_FLAGS)[flag_codes]
+    results = {}
+
+    if timestamps is not None:
+        times = timestamps[order]
+        # Rank the distinct times so group * span + key stays well inside int64
+        distinct_times = np.unique(times)
+        keys = np.searchsorted(distinct_times, times)
+        lower = np.searchsorted(distinct_times, times - time_window * 1000000000, side='right')
+        results.update(window_features(hosts, services, syn_errors, rejects, keys, lower, len(distinct_times) + 1))
+    else:
+        if verbose:
+            print("Warning: No timestamps, using neutral values for the time-window connection features")
+        results.update({col: np.full(rows, value) for col, value in TIME_WINDOW_DEFAULTS.items()})
+
+    positions = np.arange(rows)
+    host_results = window_features(hosts, services, syn_errors, rejects, positions,
+                                   np.maximum(positions - host_window + 1, 0), rows,
+                                   src_ports=group_codes(ordered('src_port')))
+    results.update({
+        'dst_host_count': host_results['count'],
+        'dst_host_srv_count': host_results['srv_count'],
+        'dst_host_same_srv_rate': host_results['same_srv_rate'],
+        'dst_host_diff_srv_rate': host_results['diff_srv_rate'],
+        'dst_host_same_src_port_rate': host_results['same_src_port_rate'],
+        'dst_host_srv_diff_host_rate': host_results['srv_diff_host_rate'],
+        'dst_host_serror_rate': host_results['serror_rate'],
+        'dst_host_srv_serror_rate': host_results['srv_serror_rate'],
+        'dst_host_rerror_rate': host_results['rerror_rate'],
+        'dst_host_srv_rerror_rate': host_results['srv_rerror_rate']
+    })
+
+    for col, values in results.items():
+        unsorted = np.empty_like(values)
+        unsorted[order] = values
+        features[col] = unsorted
+    return features
+
+class ConnectionWindows:
+    """
+    Connection features for a log read in chunks
+
+    The connections still inside a window at the end of one chunk are kept
+    and put in front of the next, so windows reach back across chunk
+    boundaries and chunked results match a single pass over a time-ordered
+    log. At most host_window connections plus those in the last time_window
+    seconds are carried over.
+    """
+    def __init__(self, time_window=TIME_WINDOW_SECONDS, host_window=HOST_WINDOW_CONNECTIONS):
+        self.time_window = time_window
+        self.host_window = host_window
+        self.history = None
+        self.chunks = 0
+
+    def __call__(self, connections):
+        index = connections.index
+        timestamps = parse_timestamps(connections['timestamp']) if 'timestamp' in connections.columns else None
+        if timestamps is not None:
+            # Parse once, so carried rows and new ones share a dtype
+            connections = connections.assign(timestamp=timestamps.view('datetime64[ns]'))
+        carried = 0 if self.history is None else len(self.history)
+        if carried:
+            connections = pd.concat([self.history, connections], ignore_index=True)
+        features = compute_connection_features(connections, self.time_window, self.host_window,
+                                               verbose=self.chunks == 0)
+        self.chunks += 1
+        self.history = self.keep_history(connections)
+        return features.iloc[carried:].set_axis(index)
+
+    def keep_history(self, connections):
+        """The connections a later one can still have in its windows"""
+        rows = len(connections)
+        keep = np.arange(max(rows - self.host_window, 0), rows)
+        if 'timestamp' in connections.columns and pd.api.types.is_datetime64_any_dtype(connections['timestamp']):
+            timestamps = connections['timestamp'].to_numpy().astype(np.int64)
+            order = np.argsort(timestamps, kind='stable')
+            recent = np.flatnonzero(timestamps > timestamps.max() - self.time_window * 1000000000)
+            keep = np.union1d(order[-self.host_window:], recent)
+        return connections.iloc[keep].reset_index(drop=True)
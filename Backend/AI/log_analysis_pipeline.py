@@ -3,16 +3,75 @@ import pandas as pd
 import joblib
 from datetime import datetime
 import csv
+import time
+import threading
+import warnings
 import numpy as np
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from log_encoding import candidate_encodings
+from log_parsers import iter_log_chunks, read_log_text, sniff_log_file
+from model_artifact import OPTIMIZED_MODEL_NAME, restore_model_components
+from log_summary_generator import analyze_predictions
+from log_formats import (TABLE_FORMATS, ChunkedTableWriter, is_columnar, iter_table_chunks,
+                         read_table, write_table)
+from pipeline_perf import perf_set, perf_stage
 
-def load_model(model_path):
+# Number of rows fed to the model per predict_proba call
+DEFAULT_BATCH_SIZE = 50000
+
+# Number of rows read per chunk in streaming mode
+DEFAULT_CHUNK_SIZE = 200000
+
+# Loaded model components per process, keyed on (absolute path, mtime)
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+
+# The model a ParallelScorer worker process scores with
+_worker_model_components = None
+
+# The bundled model's KDD attack classes, as the categories the summary and
+# the backend know; the class itself is kept in 'predicted_class'
+CATEGORY_BY_CLASS = {'dos': 'attack', 'r2l': 'attack', 'u2r': 'attack'}
+
+def load_model(model_path, mmap_mode='r', use_cache=True):
     """
     Load the machine learning model from a pickle file
+    
+    Results are cached per process on path and modification time, so repeat
+    calls are free until the file changes. Numpy arrays in uncompressed
+    artifacts (see model_artifact.py) are memory-mapped read-only, letting
+    several processes on one host share those pages.
     """
     try:
+        path = os.path.abspath(model_path)
+        cache_key = (path, os.path.getmtime(path))
+        if use_cache:
+            with _model_cache_lock:
+                model_components = _model_cache.get(cache_key)
+            if model_components is not None:
+                print(f"Using cached model from {model_path}")
+                return model_components
+        
         print(f"Loading model from {model_path}")
-        model_components = joblib.load(model_path)
-        print("Model loaded successfully")
+        start_time = time.perf_counter()
+        with warnings.catch_warnings():
+            # joblib warns that compressed pickles cannot be memory-mapped
+            warnings.filterwarnings('ignore', message='.*mmap.*')
+            model_components = restore_model_components(joblib.load(path, mmap_mode=mmap_mode))
+        # Lets scoring worker processes load the same file
+        model_components['model_path'] = path
+        elapsed = time.perf_counter() - start_time
+        print(f"Model loaded successfully in {elapsed:.2f}s")
+        
+        if use_cache:
+            with _model_cache_lock:
+                for key in [key for key in _model_cache if key[0] == path]:
+                    del _model_cache[key]
+                _model_cache[cache_key] = model_components
         return model_components
     except Exception as e:
         print(f"Error loading model: {str(e)}")
@@ -24,109 +83,640 @@ def load_model(model_path):
             'target_names': ['normal', 'probe', 'attack', 'anomaly']
         }
 
-def process_log_file(file_path, model_components=None):
+def get_target_names(model_components):
     """
-    Process a log file using the machine learning model
+    Return the class names in the column order produced by predict_proba
+    """
+    # Artifacts built around a vectorizer carry their own class names
+    if model_components.get('vectorizer') is not None and model_components.get('target_names'):
+        return [str(name) for name in model_components['target_names']]
+    
+    model = model_components['model']
+    classes = getattr(model, 'classes_', None)
+    label_encoder = model_components.get('label_encoder')
+    if label_encoder is not None and classes is not None:
+        return [str(name) for name in label_encoder.inverse_transform(np.asarray(classes))]
+    if classes is not None:
+        return [str(name) for name in classes]
+    return [str(name) for name in model_components.get('target_names', [])]
+
+def build_feature_plan(model_components):
+    """
+    Work out once how DataFrame columns map onto the model's input matrix.
+    
+    The bundled model was trained on the continuous KDD features plus one-hot
+    encoded symbolic features ('service_http', 'flag_SF', ...), so every input
+    column is resolved to a fixed position in the feature matrix.
+    """
+    model = model_components['model']
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is None:
+        feature_names = model_components.get('feature_names', [])
+    feature_names = list(feature_names)
+    positions = {name: i for i, name in enumerate(feature_names)}
+    
+    continuous = [(name, positions[name]) for name in model_components.get('continuous_features', [])
+                  if name in positions]
+    
+    symbolic = []
+    for name in model_components.get('symbolic_features', []):
+        prefix = f"{name}_"
+        values = {feature[len(prefix):]: i for feature, i in positions.items() if feature.startswith(prefix)}
+        if values:
+            symbolic.append((name, values))
+    
+    scaled = []
+    scaler = model_components.get('scaler')
+    if scaler is not None and hasattr(scaler, 'feature_names_in_'):
+        scaled = [positions[name] for name in scaler.feature_names_in_ if name in positions]
+    
+    return {
+        'n_features': len(feature_names),
+        'continuous': continuous,
+        'symbolic': symbolic,
+        'scaled': scaled,
+    }
+
+def build_feature_matrix(batch, plan, model_components):
+    """
+    Build the model input matrix for a slice of the DataFrame
     """
+    matrix = np.zeros((len(batch), plan['n_features']), dtype=np.float32)
+    
+    for name, position in plan['continuous']:
+        if name in batch.columns:
+            matrix[:, position] = pd.to_numeric(batch[name], errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+    
+    for name, values in plan['symbolic']:
+        if name not in batch.columns:
+            continue
+        column = batch[name]
+        if pd.api.types.is_numeric_dtype(column):
+            column = column.fillna(0).astype('int64')
+        positions = column.astype(str).map(values).to_numpy(dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(positions))
+        matrix[rows, positions[rows].astype(np.int64)] = 1.0
+    
+    if plan['scaled']:
+        scaler = model_components['scaler']
+        scaled = pd.DataFrame(matrix[:, plan['scaled']], columns=scaler.feature_names_in_)
+        matrix[:, plan['scaled']] = scaler.transform(scaled)
+    
+    return matrix
+
+def add_prediction_columns(df, probabilities, target_names):
+    """
+    Add 'predicted_category', 'predicted_class' and the 'prob_<class>' columns to df in place
+    
+    predicted_class is the model's own class; predicted_category maps it
+    through CATEGORY_BY_CLASS, so 'dos', 'r2l' and 'u2r' become 'attack'.
+    """
+    # Write results back as whole columns rather than row by row
+    best = probabilities.argmax(axis=1)
+    categories = [CATEGORY_BY_CLASS.get(name, name) for name in target_names]
+    df['predicted_category'] = np.asarray(categories, dtype=object)[best]
+    df['predicted_class'] = np.asarray(target_names, dtype=object)[best]
+    for i, name in enumerate(target_names):
+        df[f'prob_{name}'] = probabilities[:, i]
+
+def score_dataframe(df, model_components, batch_size=DEFAULT_BATCH_SIZE, report=True):
+    """
+    Run the model over a DataFrame in fixed-size batches.
+    
+    Adds 'predicted_category', 'predicted_class' and one 'prob_<class>'
+    column per class to df in place and returns throughput statistics for
+    the run.
+    """
+    if batch_size is None or batch_size <= 0:
+        batch_size = DEFAULT_BATCH_SIZE
+    
+    model = model_components['model']
+    vectorizer = model_components.get('vectorizer')
+    target_names = get_target_names(model_components)
+    plan = None if vectorizer is not None else build_feature_plan(model_components)
+    
+    if plan is not None and report:
+        missing = [name for name, _ in plan['continuous'] if name not in df.columns]
+        missing += [name for name, _ in plan['symbolic'] if name not in df.columns]
+        if missing:
+            print(f"Warning: {len(missing)} model features missing from input, using defaults: {missing}")
+    
+    total_rows = len(df)
+    probabilities = np.empty((total_rows, len(target_names)), dtype=np.float32)
+    
+    with perf_stage('score') as stage:
+        start_time = time.perf_counter()
+        for start in range(0, total_rows, batch_size):
+            batch = df.iloc[start:start + batch_size]
+            if vectorizer is not None:
+                features = vectorizer.transform(batch)
+            else:
+                features = build_feature_matrix(batch, plan, model_components)
+            probabilities[start:start + len(batch)] = model.predict_proba(features)
+        elapsed = time.perf_counter() - start_time
+        stage.add_rows(total_rows)
+    
+    add_prediction_columns(df, probabilities, target_names)
+    
+    rows_per_second = total_rows / elapsed if elapsed > 0 else float(total_rows)
+    if report:
+        print(f"Scored {total_rows} rows in {elapsed:.2f}s "
+              f"({rows_per_second:,.0f} rows/s, batch size {batch_size})")
+    
+    return {
+        'rows': total_rows,
+        'batch_size': batch_size,
+        'seconds': round(elapsed, 4),
+        'rows_per_second': round(rows_per_second, 2),
+    }
+
+def init_scoring_worker(model_source, threads):
+    """
+    Load the model once in a scoring worker process
+    
+    model_source is the model's path, or the model components themselves
+    when they were not loaded from a file.
+    """
+    global _worker_model_components
+    if isinstance(model_source, str):
+        model_components = load_model(model_source)
+    else:
+        model_components = model_source
+    # Each worker gets its share of the cores instead of all of them
+    if hasattr(model_components['model'], 'set_params'):
+        try:
+            model_components['model'].set_params(n_jobs=threads)
+        except ValueError:
+            pass
+    _worker_model_components = model_components
+
+def score_shard(features_name, probabilities_name, shape, n_classes, start, stop, batch_size):
+    """
+    Score rows start:stop of a shared feature matrix into a shared probability matrix
+    """
+    features_memory = shared_memory.SharedMemory(name=features_name)
+    probabilities_memory = shared_memory.SharedMemory(name=probabilities_name)
     try:
-        print(f"Processing log file: {file_path}")
+        features = np.ndarray(shape, dtype=np.float32, buffer=features_memory.buf)
+        probabilities = np.ndarray((shape[0], n_classes), dtype=np.float32, buffer=probabilities_memory.buf)
+        model = _worker_model_components['model']
+        for batch_start in range(start, stop, batch_size):
+            batch_stop = min(batch_start + batch_size, stop)
+            probabilities[batch_start:batch_stop] = model.predict_proba(features[batch_start:batch_stop])
+        # The arrays must let go of the buffers before they can be closed
+        del features, probabilities
+    finally:
+        features_memory.close()
+        probabilities_memory.close()
+    return stop - start
+
+class ParallelScorer:
+    """
+    Score DataFrames on a pool of worker processes that each load the model once
+    
+    The feature matrix of a DataFrame is built once in this process, straight
+    into shared memory, and every worker scores its own contiguous shard of
+    rows into a shared probability matrix, so neither matrix is pickled or
+    copied. Use as a context manager; the pool is kept across score() calls,
+    so streaming mode pays the worker start-up once.
+    """
+    def __init__(self, model_components, workers=None, batch_size=DEFAULT_BATCH_SIZE, model_path=None):
+        self.model_components = model_components
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size if batch_size and batch_size > 0 else DEFAULT_BATCH_SIZE
+        self.model_path = model_path or model_components.get('model_path')
+        self.plan = build_feature_plan(model_components)
+        self.target_names = get_target_names(model_components)
+        self.executor = None
+    
+    def __enter__(self):
+        threads = max((os.cpu_count() or 1) // self.workers, 1)
+        # spawn, as forking a process that runs the perf sampler thread is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_scoring_worker, initargs=(self.model_path or self.model_components, threads))
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.executor.shutdown()
+    
+    def score(self, df, report=True):
+        """
+        Same columns and statistics as score_dataframe(df, ...)
+        """
+        total_rows = len(df)
+        if total_rows == 0:
+            return score_dataframe(df, self.model_components, batch_size=self.batch_size, report=report)
         
-        # Load model if not provided
-        if model_components is None:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            model_path = os.path.join(script_dir, 'best_model.pkl')
-            model_components = load_model(model_path)
-        
-        # Determine if this is a CSV file
-        is_csv = file_path.lower().endswith('.csv')
-        
-        # Read the file with proper encoding handling
-        if is_csv:
-            # Try different encodings
-            encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']
-            df = None
-            
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(file_path, encoding=encoding)
-                    print(f"Successfully read file with {encoding} encoding")
-                    break
-                except UnicodeDecodeError:
-                    continue
-                except Exception as e:
-                    print(f"Error reading with {encoding}: {str(e)}")
-                    continue
-            
-            if df is None:
-                raise Exception("Could not read file with any supported encoding")
-        else:
-            # For non-CSV files, try to read as text and convert to DataFrame
-            encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']
-            lines = None
+        shape = (total_rows, self.plan['n_features'])
+        n_classes = len(self.target_names)
+        features_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 4)
+        probabilities_memory = shared_memory.SharedMemory(create=True, size=total_rows * n_classes * 4)
+        try:
+            features = np.ndarray(shape, dtype=np.float32, buffer=features_memory.buf)
+            with perf_stage('build_features') as stage:
+                for start in range(0, total_rows, self.batch_size):
+                    batch = df.iloc[start:start + self.batch_size]
+                    features[start:start + len(batch)] = build_feature_matrix(batch, self.plan, self.model_components)
+                stage.add_rows(total_rows)
             
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        lines = f.readlines()
-                    print(f"Successfully read file with {encoding} encoding")
-                    break
-                except UnicodeDecodeError:
-                    continue
-                except Exception as e:
-                    print(f"Error reading with {encoding}: {str(e)}")
-                    continue
+            with perf_stage('score') as stage:
+                start_time = time.perf_counter()
+                bounds = np.linspace(0, total_rows, min(self.workers, total_rows) + 1).astype(int)
+                futures = [self.executor.submit(score_shard, features_memory.name, probabilities_memory.name,
+                                                shape, n_classes, int(start), int(stop), self.batch_size)
+                           for start, stop in zip(bounds[:-1], bounds[1:])]
+                for future in futures:
+                    future.result()
+                elapsed = time.perf_counter() - start_time
+                stage.add_rows(total_rows)
+                stage.set('workers', len(futures))
             
-            if lines is None:
-                raise Exception("Could not read file with any supported encoding")
-            
-            # Simple parsing for demonstration
-            header = lines[0].strip().split(',')
-            data = []
-            for line in lines[1:]:
-                data.append(line.strip().split(','))
-            
-            df = pd.DataFrame(data, columns=header)
+            probabilities = np.ndarray((total_rows, n_classes), dtype=np.float32, buffer=probabilities_memory.buf)
+            add_prediction_columns(df, probabilities, self.target_names)
+            del features, probabilities
+        finally:
+            features_memory.close()
+            features_memory.unlink()
+            probabilities_memory.close()
+            probabilities_memory.unlink()
         
-        # If no model is provided, generate fake predictions for testing
-        if model_components is None or model_components['model'] is None:
-            print("No model provided, generating mock predictions")
-            categories = ['normal', 'probe', 'attack', 'anomaly']
-            weights = [0.7, 0.1, 0.1, 0.1]  # Default distribution
+        rows_per_second = total_rows / elapsed if elapsed > 0 else float(total_rows)
+        if report:
+            print(f"Scored {total_rows} rows in {elapsed:.2f}s "
+                  f"({rows_per_second:,.0f} rows/s, {len(futures)} workers, batch size {self.batch_size})")
+        return {
+            'rows': total_rows,
+            'batch_size': self.batch_size,
+            'workers': len(futures),
+            'seconds': round(elapsed, 4),
+            'rows_per_second': round(rows_per_second, 2),
+        }
+
+@contextmanager
+def open_scorer(model_components, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """
+    Yield a score(df, report=True) function for the model
+    
+    With workers > 1 and a real feature-matrix model the rows are scored by a
+    ParallelScorer; otherwise this is score_dataframe in this process.
+    """
+    use_model = model_components is not None and model_components['model'] is not None
+    if use_model and workers and workers > 1 and model_components.get('vectorizer') is None:
+        with ParallelScorer(model_components, workers=workers, batch_size=batch_size) as scorer:
+            yield scorer.score
+    else:
+        yield lambda df, report=True: score_dataframe(df, model_components, batch_size=batch_size, report=report)
+
+def generate_mock_predictions(df):
+    """
+    Fill df with random predictions when no model is available
+    """
+    with perf_stage('score') as stage:
+        stage.set('mock_predictions', True)
+        stage.add_rows(len(df))
+        
+        categories = ['normal', 'probe', 'attack', 'anomaly']
+        weights = [0.7, 0.1, 0.1, 0.1]  # Default distribution
+        
+        # Generate predictions
+        df['predicted_category'] = np.random.choice(categories, size=len(df), p=weights)
+        
+        # Generate probability columns
+        for cat in categories:
+            df[f'prob_{cat}'] = np.random.random(len(df)) * 0.3  # Base probabilities
+        
+        # Adjust probabilities for the predicted category to be higher
+        for category in categories:
+            mask = df['predicted_category'] == category
+            if mask.any():
+                prob_col = f'prob_{category}'
+                df.loc[mask, prob_col] = 0.7 + np.random.random(mask.sum()) * 0.3
+
+def get_output_path(file_path, output_format='csv', output_dir=None):
+    """
+    Build the timestamped predictions file name next to the input file, or in output_dir
+    """
+    dir_name = output_dir or os.path.dirname(file_path)
+    base_name = os.path.basename(file_path)
+    name_without_ext = os.path.splitext(base_name)[0]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    extension = TABLE_FORMATS[output_format]
+    return os.path.join(dir_name, f"{name_without_ext}_predictions_{timestamp}{extension}")
+
+def print_prediction_summary(prediction_counts, total_rows):
+    """
+    Print the per-category prediction breakdown
+    """
+    print("\nPrediction Summary:")
+    for category, count in prediction_counts.items():
+        print(f"  {category}: {count} ({count/total_rows*100:.2f}%)")
+
+def score_chunks(chunks, writer, model_components, batch_size=DEFAULT_BATCH_SIZE, transform=None, workers=None):
+    """
+    Score each chunk and hand it to writer, keeping only running totals
+    
+    transform, if given, is applied to every chunk before it is scored.
+    With workers > 1 chunks are scored by a ParallelScorer.
+    """
+    use_model = model_components is not None and model_components['model'] is not None
+    prediction_counts = Counter()
+    scoring_seconds = 0.0
+    
+    chunks = iter(chunks)
+    with open_scorer(model_components, batch_size, workers) as score:
+        while True:
+            # Reading happens as the chunk iterator advances, so time it here
+            with perf_stage('read') as stage:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    stage.add_rows(len(chunk))
+            if chunk is None:
+                break
             
-            # Generate predictions
-            df['predicted_category'] = np.random.choice(categories, size=len(df), p=weights)
+            if transform is not None:
+                with perf_stage('transform') as stage:
+                    chunk = transform(chunk)
+                    stage.add_rows(len(chunk))
             
-            # Generate probability columns
-            for cat in categories:
-                df[f'prob_{cat}'] = np.random.random(len(df)) * 0.3  # Base probabilities
+            if use_model:
+                stats = score(chunk, report=False)
+                scoring_seconds += stats['seconds']
+            else:
+                generate_mock_predictions(chunk)
             
-            # Adjust probabilities for the predicted category to be higher
-            for category in categories:
-                mask = df['predicted_category'] == category
-                if mask.any():
-                    prob_col = f'prob_{category}'
-                    df.loc[mask, prob_col] = 0.7 + np.random.random(mask.sum()) * 0.3
+            with perf_stage('write_predictions') as stage:
+                writer.write(chunk)
+                stage.add_rows(len(chunk))
+            prediction_counts.update(chunk['predicted_category'].value_counts().to_dict())
+    
+    return prediction_counts, writer.rows, scoring_seconds
+
+def process_log_file_streaming(file_path, model_components, batch_size=DEFAULT_BATCH_SIZE,
+                               chunk_size=DEFAULT_CHUNK_SIZE, output_format='csv', transform=None,
+                               output_dir=None, workers=None):
+    """
+    Score a log file chunk by chunk, appending each chunk to the predictions file.
+    
+    Only one chunk is held in memory at a time, so peak memory depends on
+    chunk_size rather than on the size of the input file. transform is
+    applied to each chunk as it is read, before scoring.
+    """
+    is_csv = file_path.lower().endswith('.csv')
+    use_model = model_components is not None and model_components['model'] is not None
+    if not use_model:
+        print("No model provided, generating mock predictions")
+    
+    output_path = get_output_path(file_path, output_format, output_dir)
+    
+    if is_columnar(file_path):
+        with ChunkedTableWriter(output_path) as writer:
+            prediction_counts, total_rows, scoring_seconds = score_chunks(
+                iter_table_chunks(file_path, chunk_size), writer, model_components, batch_size, transform, workers)
+    else:
+        for attempt, encoding in enumerate(candidate_encodings(file_path), start=1):
+            perf_set('read', 'encoding_attempts', attempt)
+            try:
+                if is_csv:
+                    chunks = pd.read_csv(file_path, encoding=encoding, chunksize=chunk_size)
+                else:
+                    chunks = iter_log_chunks(file_path, encoding, chunk_size)
+                
+                # A fresh writer and adapter per attempt, so a retried encoding starts clean
+                with ChunkedTableWriter(output_path) as writer:
+                    prediction_counts, total_rows, scoring_seconds = score_chunks(
+                        chunks, writer, model_components, batch_size, parsed_log_transform(file_path, transform),
+                        workers)
+                
+                print(f"Successfully read file with {encoding} encoding")
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise Exception("Could not read file with any supported encoding")
+    
+    if total_rows == 0:
+        raise Exception(f"No rows found in {file_path}")
+    
+    if use_model:
+        rows_per_second = total_rows / scoring_seconds if scoring_seconds > 0 else float(total_rows)
+        print(f"Scored {total_rows} rows in {scoring_seconds:.2f}s "
+              f"({rows_per_second:,.0f} rows/s, batch size {batch_size}, chunk size {chunk_size})")
+    
+    print(f"Predictions saved to: {output_path}")
+    print_prediction_summary(dict(prediction_counts.most_common()), total_rows)
+    
+    return output_path
+
+def read_log_file(file_path):
+    """
+    Read a log file into a DataFrame
+    """
+    # Determine if this is a CSV file
+    is_csv = file_path.lower().endswith('.csv')
+    
+    # Read the file with proper encoding handling, sniffing the
+    # encoding once instead of re-parsing the whole file per guess
+    if is_columnar(file_path):
+        df = read_table(file_path)
+    elif is_csv:
+        encodings = candidate_encodings(file_path)
+        df = None
+        
+        for attempt, encoding in enumerate(encodings, start=1):
+            perf_set('read', 'encoding_attempts', attempt)
+            try:
+                df = pd.read_csv(file_path, encoding=encoding)
+                print(f"Successfully read file with {encoding} encoding")
+                break
+            except UnicodeDecodeError:
+                continue
+            except Exception as e:
+                print(f"Error reading with {encoding}: {str(e)}")
+                continue
+        
+        if df is None:
+            raise Exception("Could not read file with any supported encoding")
+    else:
+        # Syslog, access and NDJSON logs are parsed by the format sniffed from
+        # their first lines; anything else is read as CSV
+        encodings = candidate_encodings(file_path)
+        df = None
+        
+        for attempt, encoding in enumerate(encodings, start=1):
+            perf_set('read', 'encoding_attempts', attempt)
+            try:
+                df = read_log_text(file_path, encoding)
+                print(f"Successfully read file with {encoding} encoding")
+                break
+            except UnicodeDecodeError:
+                continue
+            except Exception as e:
+                print(f"Error reading with {encoding}: {str(e)}")
+                continue
+        
+        if df is None:
+            raise Exception("Could not read file with any supported encoding")
+    
+    return df
+
+def parsed_log_transform(file_path, transform=None):
+    """
+    The transform to score file_path with
+
+    Syslog, access and NDJSON logs are parsed into the redhawk_dataset columns
+    rather than the model's features, so unless a transform is given they go
+    through the same adapter as a redhawk_dataset CSV.
+    """
+    if transform is not None or is_columnar(file_path) or file_path.lower().endswith('.csv'):
+        return transform
+    for encoding in candidate_encodings(file_path):
+        try:
+            log_format = sniff_log_file(file_path, encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        return None
+    if log_format == 'csv':
+        return None
+    
+    # Imported here because the adapter imports this module
+    from log_analysis_pipeline_adapter import ChunkAdapter
+    return ChunkAdapter()
+
+def score_log_file(file_path, model_components, batch_size=DEFAULT_BATCH_SIZE, transform=None, workers=None):
+    """
+    Read a log file and return it with prediction columns added
+    
+    With workers > 1 the rows are scored by a ParallelScorer.
+    """
+    with perf_stage('read') as stage:
+        df = read_log_file(file_path)
+        stage.add_rows(len(df))
+    transform = parsed_log_transform(file_path, transform)
+    if transform is not None:
+        with perf_stage('transform') as stage:
+            df = transform(df)
+            stage.add_rows(len(df))
+    
+    # If no model is provided, generate fake predictions for testing
+    if model_components is None or model_components['model'] is None:
+        print("No model provided, generating mock predictions")
+        generate_mock_predictions(df)
+    else:
+        with open_scorer(model_components, batch_size, workers) as score:
+            score(df)
+    
+    return df
+
+def get_default_model_path():
+    """
+    Path of the model bundled with this module
+    
+    The optimized artifact written by model_artifact.py is preferred when it
+    is at least as new as best_model.pkl.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    model_path = os.path.join(script_dir, 'best_model.pkl')
+    optimized_path = os.path.join(script_dir, OPTIMIZED_MODEL_NAME)
+    if os.path.exists(optimized_path) and (
+            not os.path.exists(model_path) or os.path.getmtime(optimized_path) >= os.path.getmtime(model_path)):
+        model_path = optimized_path
+    return model_path
+
+def load_default_model():
+    """
+    Load the model bundled with this module
+    """
+    with perf_stage('load_model'):
+        return load_model(get_default_model_path())
+
+def process_log_file(file_path, model_components=None, batch_size=DEFAULT_BATCH_SIZE, chunk_size=None,
+                     output_format='csv', transform=None, output_dir=None, workers=None):
+    """
+    Process a log file using the machine learning model
+    
+    When chunk_size is set the file is streamed in chunks of that many rows
+    instead of being loaded into memory at once. output_format selects the
+    predictions file format ('csv', 'feather' or 'parquet'); Feather and
+    Parquet inputs are read directly without text parsing. transform, if
+    given, maps the rows read (or each chunk) to the DataFrame that is
+    scored; syslog, access and NDJSON logs are adapted when it is not. The
+    predictions file goes next to the input unless output_dir is set.
+    workers > 1 scores on that many processes.
+    """
+    try:
+        print(f"Processing log file: {file_path}")
+        
+        # Load model if not provided
+        if model_components is None:
+            model_components = load_default_model()
+        
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        if chunk_size:
+            return process_log_file_streaming(file_path, model_components, batch_size=batch_size,
+                                              chunk_size=chunk_size, output_format=output_format,
+                                              transform=transform, output_dir=output_dir, workers=workers)
+        
+        df = score_log_file(file_path, model_components, batch_size=batch_size, transform=transform,
+                            workers=workers)
         
         # Generate output file name
-        dir_name = os.path.dirname(file_path)
-        base_name = os.path.basename(file_path)
-        name_without_ext = os.path.splitext(base_name)[0]
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = os.path.join(dir_name, f"{name_without_ext}_predictions_{timestamp}.csv")
+        output_path = get_output_path(file_path, output_format, output_dir)
         
         # Save results
-        df.to_csv(output_path, index=False)
+        with perf_stage('write_predictions') as stage:
+            write_table(df, output_path)
+            stage.add_rows(len(df))
         print(f"Predictions saved to: {output_path}")
         
         # Generate a summary
         prediction_counts = df['predicted_category'].value_counts().to_dict()
-        print("\nPrediction Summary:")
-        for category, count in prediction_counts.items():
-            print(f"  {category}: {count} ({count/len(df)*100:.2f}%)")
+        print_prediction_summary(prediction_counts, len(df))
         
         return output_path
     except Exception as e:
         print(f"Error processing file {file_path}: {str(e)}")
         import traceback
         traceback.print_exc()
-        return None 
\ No newline at end of file
+        return None
+
+def analyze_log_file(file_path, model_components=None, batch_size=DEFAULT_BATCH_SIZE,
+                     save_predictions=False, output_format='csv', workers=None):
+    """
+    Score a log file and summarize it in one pass, without an intermediate file
+    
+    The scored DataFrame goes straight to the summarizer. The predictions file
+    is only written when save_predictions is set. Returns a tuple of
+    (analysis_result, predictions_path), or (None, None) on failure.
+    """
+    try:
+        print(f"Processing log file: {file_path}")
+        
+        # Load model if not provided
+        if model_components is None:
+            model_components = load_default_model()
+        
+        df = score_log_file(file_path, model_components, batch_size=batch_size, workers=workers)
+        print_prediction_summary(df['predicted_category'].value_counts().to_dict(), len(df))
+        
+        output_path = None
+        if save_predictions:
+            output_path = get_output_path(file_path, output_format)
+            with perf_stage('write_predictions') as stage:
+                write_table(df, output_path)
+                stage.add_rows(len(df))
+            print(f"Predictions saved to: {output_path}")
+        
+        with perf_stage('summarize') as stage:
+            analysis_result, _ = analyze_predictions(df)
+            stage.add_rows(len(df))
+        return analysis_result, output_path
+    except Exception as e:
+        print(f"Error processing file {file_path}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None, None
@@ -5,20 +5,202 @@ import os
 import argparse
 import sys
 from datetime import datetime
-from log_analysis_pipeline import load_model, process_log_file
+from connection_features import compute_connection_features, ConnectionWindows
+from log_analysis_pipeline import DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE, load_model, process_log_file
+from log_formats import TABLE_FORMATS, read_table, write_table
 
-def adapt_dataset(file_path, output_dir=None):
+# Source columns copied into the model's format, and the value used when one is missing
+COLUMN_MAP = {
+    'protocol': 'protocol_type',
+    'service': 'service',
+    'flag': 'flag',
+    'bytes': 'bytes',
+    'duration': 'duration',
+    'src_port': 'src_port',
+    'dst_port': 'dst_port'
+}
+
+COLUMN_DEFAULTS = {
+    'protocol_type': 'tcp',
+    'service': 'http',
+    'flag': 'SF',
+    'bytes': 0,
+    'duration': 0,
+    'src_port': 0,
+    'dst_port': 0
+}
+
+# Host features the source logs don't carry, filled with neutral values
+CONSTANT_FEATURES = {
+    'root_shell': 0,
+    'su_attempted': 0,
+    'is_host_login': 0,
+    'is_guest_login': 0
+}
+
+LOGGED_IN_VALUES = ['success', 'successful', 'true', '1']
+NORMAL_ATTACK_TYPES = ['normal', 'none', 'nan', '']
+MALWARE_VALUES = ['true', '1', 'yes']
+
+def match_lowercase(series, values, missing=False):
+    """
+    Boolean mask of rows whose str(value).lower() is in values
+
+    The string work is done once per distinct value rather than once per row,
+    which matters for the low-cardinality columns of network logs. Missing
+    values are set to missing.
+    """
+    codes, uniques = pd.factorize(series)
+    matches = np.fromiter((str(value).lower() in values for value in uniques), dtype=bool, count=len(uniques))
+    mask = np.full(len(series), missing, dtype=bool)
+    present = codes >= 0
+    mask[present] = matches[codes[present]]
+    return mask
+
+def adapt_dataframe(data, include_original=True, verbose=True, windows=None):
+    """
+    Build the model's input columns from a redhawk_dataset DataFrame
+
+    include_original=False leaves out the original_<name> copies of the
+    source columns, which otherwise double the frame's memory. verbose=False
+    silences the missing-column warnings. windows is a ConnectionWindows
+    carrying the traffic windows over from earlier chunks of the same log.
+    """
+    # Columns are set one at a time on a frame with the source index, so
+    # scalar defaults broadcast and pandas never has to consolidate blocks
+    adapted_data = pd.DataFrame(index=data.index)
+
+    # Copy mapped columns
+    for source, target in COLUMN_MAP.items():
+        if source in data.columns:
+            adapted_data[target] = data[source]
+        else:
+            if verbose:
+                print(f"Warning: Source column '{source}' not found, using default values for '{target}'")
+            adapted_data[target] = COLUMN_DEFAULTS[target]
+
+    # Add binary features (0/1) based on existing data
+    try:
+        if 'src_ip' in data.columns and 'dst_ip' in data.columns and 'src_port' in data.columns and 'dst_port' in data.columns:
+            adapted_data['land'] = ((data['src_ip'] == data['dst_ip']) &
+                                    (data['src_port'] == data['dst_port'])).astype(int)
+        else:
+            if verbose:
+                print("Warning: IP or port columns missing, using default value for 'land'")
+            adapted_data['land'] = 0
+    except Exception as e:
+        print(f"Error processing 'land' feature: {str(e)}")
+        adapted_data['land'] = 0
+
+    adapted_data['wrong_fragment'] = 0
+    adapted_data['urgent'] = 0
+
+    # Use auth_result to determine logged_in
+    try:
+        if 'auth_result' in data.columns:
+            adapted_data['logged_in'] = match_lowercase(data['auth_result'], LOGGED_IN_VALUES).astype(int)
+        else:
+            if verbose:
+                print("Warning: 'auth_result' column missing, using default value for 'logged_in'")
+            adapted_data['logged_in'] = 0
+    except Exception as e:
+        print(f"Error processing 'logged_in' feature: {str(e)}")
+        adapted_data['logged_in'] = 0
+
+    for col, value in CONSTANT_FEATURES.items():
+        adapted_data[col] = value
+
+    # Traffic features (count, serror_rate, dst_host_count, ...) from the
+    # connections around each one, by destination host and service
+    connections = pd.DataFrame({
+        'service': adapted_data['service'],
+        'flag': adapted_data['flag'],
+        'src_port': adapted_data['src_port']
+    }, index=data.index)
+    if 'timestamp' in data.columns:
+        connections['timestamp'] = data['timestamp']
+    if 'dst_ip' in data.columns:
+        connections['dst_host'] = data['dst_ip']
+    if windows is not None:
+        connection_features = windows(connections)
+    else:
+        connection_features = compute_connection_features(connections, verbose=verbose)
+    for col in connection_features.columns:
+        adapted_data[col] = connection_features[col]
+
+    # Add the 'class' column if attack_type is available
+    try:
+        if 'attack_type' in data.columns:
+            # Missing and normal-looking attack types are normal traffic
+            is_normal = match_lowercase(data['attack_type'], NORMAL_ATTACK_TYPES, missing=True)
+            adapted_data['class'] = np.where(is_normal, 'normal', 'attack').astype(object)
+        elif 'is_malware' in data.columns:
+            is_malware = match_lowercase(data['is_malware'], MALWARE_VALUES)
+            adapted_data['class'] = np.where(is_malware, 'attack', 'normal').astype(object)
+        else:
+            if verbose:
+                print("Warning: No attack type indicators found, using default 'normal' class")
+            adapted_data['class'] = 'normal'
+    except Exception as e:
+        print(f"Error processing 'class' feature: {str(e)}")
+        adapted_data['class'] = 'normal'
+
+    if include_original:
+        # Add source data columns with original values for reference
+        # Use prefix to avoid column name conflicts
+        for col in data.columns:
+            adapted_data[f'original_{col}'] = data[col]
+
+    return adapted_data
+
+class ChunkAdapter:
+    """
+    Chunk transform for process_log_file that adapts each chunk as it is read
+
+    Missing-column warnings are only printed for the first chunk, since every
+    chunk of a file has the same columns. The connection windows carry over
+    from one chunk to the next.
+    """
+    def __init__(self, include_original=True):
+        self.include_original = include_original
+        self.windows = ConnectionWindows()
+        self.chunks = 0
+
+    def __call__(self, chunk):
+        adapted = adapt_dataframe(chunk, include_original=self.include_original, verbose=self.chunks == 0,
+                                  windows=self.windows)
+        self.chunks += 1
+        return adapted
+
+def adapt_and_score(file_path, model_components, output_dir=None, output_format='csv', include_original=True,
+                    batch_size=DEFAULT_BATCH_SIZE, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Adapt and score a redhawk_dataset file in one streaming pass
+
+    Each chunk is adapted in memory and scored straight away, so no adapted
+    file is written and peak memory depends on chunk_size, not on the size
+    of the input. Returns the predictions file path, or None on failure.
+    """
+    print(f"Adapting and scoring dataset: {file_path}")
+    return process_log_file(file_path, model_components, batch_size=batch_size, chunk_size=chunk_size,
+                            output_format=output_format, transform=ChunkAdapter(include_original),
+                            output_dir=output_dir)
+
+def adapt_dataset(file_path, output_dir=None, output_format='csv', include_original=True):
     """
     Adapt the redhawk_dataset_2.csv format to match the format expected by the model
+    
+    output_format is 'csv', 'feather' or 'parquet'; the input may be any of them.
+    include_original=False leaves out the original_* passthrough columns.
     """
     try:
         print(f"Adapting dataset: {file_path}")
         
-        # Read the CSV file
+        # Read the input file
         try:
-            data = pd.read_csv(file_path)
+            data = read_table(file_path)
         except Exception as e:
-            print(f"Error reading CSV file: {str(e)}")
+            print(f"Error reading input file: {str(e)}")
             return None
         
         if data.empty:
@@ -28,125 +210,7 @@ def adapt_dataset(file_path, output_dir=None):
         print(f"Original columns: {data.columns.tolist()}")
         print(f"Original shape: {data.shape}")
         
-        # Create a new dataframe with the expected columns
-        # Map existing columns to the expected format where possible
-        adapted_data = pd.DataFrame()
-        
-        # Map column names from new format to expected format
-        # These mappings are based on typical IDS features
-        column_map = {
-            'protocol': 'protocol_type',
-            'service': 'service', 
-            'flag': 'flag',
-            'bytes': 'bytes',
-            'duration': 'duration',
-            'src_port': 'src_port',
-            'dst_port': 'dst_port'
-        }
-        
-        # Copy mapped columns
-        for source, target in column_map.items():
-            if source in data.columns:
-                adapted_data[target] = data[source]
-            else:
-                print(f"Warning: Source column '{source}' not found, using default values for '{target}'")
-                # Use default values based on column type
-                if 'port' in target:
-                    adapted_data[target] = 0  # Default port number
-                elif target == 'protocol_type':
-                    adapted_data[target] = 'tcp'  # Default protocol
-                elif target == 'service':
-                    adapted_data[target] = 'http'  # Default service
-                elif target == 'flag':
-                    adapted_data[target] = 'SF'  # Default flag (normal)
-                elif target in ['bytes', 'duration']:
-                    adapted_data[target] = 0  # Default numeric value
-                else:
-                    adapted_data[target] = 'unknown'  # Default string
-        
-        # Add binary features (0/1) based on existing data
-        try:
-            if 'src_ip' in data.columns and 'dst_ip' in data.columns and 'src_port' in data.columns and 'dst_port' in data.columns:
-                adapted_data['land'] = ((data['src_ip'] == data['dst_ip']) & 
-                                        (data['src_port'] == data['dst_port'])).astype(int)
-            else:
-                print("Warning: IP or port columns missing, using default value for 'land'")
-                adapted_data['land'] = 0
-        except Exception as e:
-            print(f"Error processing 'land' feature: {str(e)}")
-            adapted_data['land'] = 0
-        
-        adapted_data['wrong_fragment'] = 0  # Default to 0
-        adapted_data['urgent'] = 0  # Default to 0
-        
-        # Use auth_result to determine logged_in
-        try:
-            if 'auth_result' in data.columns:
-                adapted_data['logged_in'] = data['auth_result'].apply(
-                    lambda x: 1 if str(x).lower() in ['success', 'successful', 'true', '1'] else 0
-                )
-            else:
-                print("Warning: 'auth_result' column missing, using default value for 'logged_in'")
-                adapted_data['logged_in'] = 0
-        except Exception as e:
-            print(f"Error processing 'logged_in' feature: {str(e)}")
-            adapted_data['logged_in'] = 0
-        
-        # Add remaining required columns with default values
-        adapted_data['root_shell'] = 0
-        adapted_data['su_attempted'] = 0
-        adapted_data['is_host_login'] = 0
-        adapted_data['is_guest_login'] = 0
-        
-        # Add basic network features
-        adapted_data['count'] = 1
-        adapted_data['srv_count'] = 1
-        adapted_data['serror_rate'] = 0
-        adapted_data['srv_serror_rate'] = 0
-        adapted_data['rerror_rate'] = 0
-        adapted_data['srv_rerror_rate'] = 0
-        adapted_data['same_srv_rate'] = 1
-        adapted_data['diff_srv_rate'] = 0
-        adapted_data['srv_diff_host_rate'] = 0
-        
-        # Add the 'class' column if attack_type is available
-        try:
-            if 'attack_type' in data.columns:
-                # Map attack types to classes
-                adapted_data['class'] = data['attack_type'].apply(
-                    lambda x: 'normal' if pd.isna(x) or str(x).lower() in ['normal', 'none', 'nan', '']
-                    else 'attack'
-                )
-            elif 'is_malware' in data.columns:
-                # Use is_malware to determine class
-                adapted_data['class'] = data['is_malware'].apply(
-                    lambda x: 'attack' if str(x).lower() in ['true', '1', 'yes'] else 'normal'
-                )
-            else:
-                print("Warning: No attack type indicators found, using default 'normal' class")
-                adapted_data['class'] = 'normal'
-        except Exception as e:
-            print(f"Error processing 'class' feature: {str(e)}")
-            adapted_data['class'] = 'normal'
-        
-        # Add source data columns with original values for reference
-        # Use prefix to avoid column name conflicts
-        for col in data.columns:
-            adapted_data[f'original_{col}'] = data[col]
-            
-        # Ensure all expected columns are present
-        expected_columns = [
-            'protocol_type', 'service', 'flag', 'land', 'wrong_fragment', 'urgent',
-            'logged_in', 'root_shell', 'su_attempted', 'is_host_login', 'is_guest_login',
-            'count', 'srv_count', 'serror_rate', 'srv_serror_rate', 'rerror_rate',
-            'srv_rerror_rate', 'same_srv_rate', 'diff_srv_rate', 'srv_diff_host_rate',
-            'class'
-        ]
-        
-        for col in expected_columns:
-            if col not in adapted_data.columns:
-                print(f"Warning: Required column '{col}' missing, adding default values")
-                adapted_data[col] = 'default' if col in ['protocol_type', 'service', 'flag', 'class'] else 0
+        adapted_data = adapt_dataframe(data, include_original=include_original)
             
         print(f"Adapted columns: {adapted_data.columns.tolist()}")
         print(f"Adapted shape: {adapted_data.shape}")
@@ -158,16 +222,16 @@ def adapt_dataset(file_path, output_dir=None):
                 base_name = os.path.basename(file_path)
                 name_without_ext = os.path.splitext(base_name)[0]
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_path = os.path.join(output_dir, f"{name_without_ext}_adapted_{timestamp}.csv")
+                output_path = os.path.join(output_dir, f"{name_without_ext}_adapted_{timestamp}{TABLE_FORMATS[output_format]}")
             else:
                 dir_name = os.path.dirname(file_path)
                 base_name = os.path.basename(file_path)
                 name_without_ext = os.path.splitext(base_name)[0]
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_path = os.path.join(dir_name, f"{name_without_ext}_adapted_{timestamp}.csv")
+                output_path = os.path.join(dir_name, f"{name_without_ext}_adapted_{timestamp}{TABLE_FORMATS[output_format]}")
             
             # Save adapted dataset
-            adapted_data.to_csv(output_path, index=False)
+            write_table(adapted_data, output_path)
             print(f"Adapted dataset saved to: {output_path}")
             
             return output_path
@@ -190,11 +254,36 @@ def main():
                         help='Output directory for prediction files')
     parser.add_argument('--skip-processing', action='store_true',
                         help='Skip processing with the model, only adapt the dataset')
+    parser.add_argument('--output-format', choices=list(TABLE_FORMATS), default='csv',
+                        help='File format for the adapted and prediction files (default: csv)')
+    parser.add_argument('--no-original', action='store_true',
+                        help='Leave the original_* passthrough columns out of the adapted file')
+    parser.add_argument('--fused', action='store_true',
+                        help='Adapt and score chunk by chunk in one pass, writing only the predictions file')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows per chunk in --fused mode (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rows scored per model call (default: {DEFAULT_BATCH_SIZE})')
     
     args = parser.parse_args()
     
+    if args.fused and args.skip_processing:
+        parser.error("--fused scores while adapting and cannot be combined with --skip-processing")
+    
+    if args.fused:
+        model_components = load_model(args.model)
+        output_path = adapt_and_score(args.input, model_components, output_dir=args.output,
+                                      output_format=args.output_format, include_original=not args.no_original,
+                                      batch_size=args.batch_size, chunk_size=args.chunk_size)
+        if not output_path:
+            print("Processing failed")
+            sys.exit(1)
+        print(f"Processing completed, results saved to: {output_path}")
+        sys.exit(0)
+    
     # Adapt the dataset
-    adapted_file = adapt_dataset(args.input, args.output)
+    adapted_file = adapt_dataset(args.input, args.output, output_format=args.output_format,
+                                 include_original=not args.no_original)
     
     if not adapted_file:
         print("Dataset adaptation failed")
@@ -210,8 +299,9 @@ def main():
     try:
         model_components = load_model(args.model)
         
-        # Process the adapted file
-        output_path = process_log_file(adapted_file, model_components, args.output)
+        # Process the adapted file; predictions are written next to it in args.output
+        output_path = process_log_file(adapted_file, model_components, batch_size=args.batch_size,
+                                       output_format=args.output_format)
         
         if output_path:
             print(f"Processing completed, results saved to: {output_path}")
@@ -0,0 +1,53 @@
+import codecs
+
+# Bytes read from the start of a file when guessing its encoding
+DEFAULT_SNIFF_BYTES = 1024 * 1024
+
+# latin1 maps every byte to a character, so decoding with it never fails
+FALLBACK_ENCODING = 'latin1'
+
+# Checked longest first so UTF-32 LE is not mistaken for UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+def detect_encoding(file_path, sniff_bytes=DEFAULT_SNIFF_BYTES):
+    """
+    Guess the text encoding of a file from its BOM and a bounded byte prefix
+
+    Only the first sniff_bytes bytes are read, so the cost does not grow with
+    the file size. Files without a BOM whose prefix is valid UTF-8 are reported
+    as 'utf-8', anything else falls back to latin1, which is what the old
+    utf-8 -> utf-8-sig -> latin1 retry loop ended up with.
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sniff_bytes)
+
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # A short read means we have the whole file and can decode it strictly,
+    # otherwise allow the prefix to end in the middle of a multi-byte character
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        decoder.decode(sample, final=len(sample) < sniff_bytes)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+def candidate_encodings(file_path, sniff_bytes=DEFAULT_SNIFF_BYTES):
+    """
+    Return the encodings a reader should try, in order
+
+    This is the detected encoding followed by the latin1 fallback, for the rare
+    file whose non-UTF-8 bytes only appear after the sniffed prefix.
+    """
+    encoding = detect_encoding(file_path, sniff_bytes)
+    if encoding == FALLBACK_ENCODING:
+        return [encoding]
+    return [encoding, FALLBACK_ENCODING]
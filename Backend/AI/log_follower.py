@@ -0,0 +1,254 @@
+import os
+import io
+import json
+import time
+import argparse
+import pandas as pd
+from collections import deque
+from datetime import datetime
+
+from log_encoding import FALLBACK_ENCODING, candidate_encodings
+from log_analysis_pipeline import (DEFAULT_BATCH_SIZE, generate_mock_predictions, load_default_model,
+                                   load_model, score_dataframe)
+from log_summary_generator import (add_aggregate_totals, analyze_predictions, merge_aggregates,
+                                   recommend_entry_action, summary_from_aggregate)
+from pipeline_perf import PerfRun, perf_stage
+from summary_writer import DEFAULT_INDENT, get_temp_path, write_summary
+
+# Most bytes read from the log per poll; the rest waits for the next poll
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Seconds between polls in follow mode
+DEFAULT_INTERVAL = 5.0
+
+# Latest scored entries kept in the checkpoint and shown in the summary
+DEFAULT_RECENT_ENTRIES = 100
+
+CHECKPOINT_VERSION = 1
+
+def get_checkpoint_path(log_file):
+    return f"{log_file}.checkpoint.json"
+
+def new_checkpoint(log_file):
+    return {
+        'version': CHECKPOINT_VERSION,
+        'log_file': os.path.abspath(log_file),
+        'inode': None,
+        'offset': 0,
+        'header': None,
+        'encoding': None,
+        'aggregate': merge_aggregates([]),
+        'recent_entries': [],
+        'updated_at': None,
+    }
+
+def load_checkpoint(checkpoint_file, log_file):
+    """
+    Load the checkpoint for log_file, or start a new one
+    """
+    if not os.path.exists(checkpoint_file):
+        return new_checkpoint(log_file)
+    try:
+        with open(checkpoint_file, 'r') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            print(f"Warning: Checkpoint {checkpoint_file} has an unknown version, starting over")
+            return new_checkpoint(log_file)
+        return checkpoint
+    except Exception as e:
+        print(f"Error reading checkpoint {checkpoint_file}: {str(e)}, starting over")
+        return new_checkpoint(log_file)
+
+def write_json_atomic(data, path, **dump_kwargs):
+    """
+    Write JSON to a temporary file and rename it over path, so readers never
+    see a half-written file
+    """
+    tmp_path = get_temp_path(path)
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp_path, path)
+
+def read_new_lines(log_file, checkpoint, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Return the complete lines appended since the checkpoint offset, as bytes
+
+    The header line is read on the first call. About max_bytes are read per
+    call, but a line longer than that is read on to its newline rather than
+    stalling the follower. A trailing line without a newline is left for
+    the next poll, since the writer may still be on it. If the file was
+    truncated or replaced, the checkpoint starts over.
+    """
+    stat = os.stat(log_file)
+    if checkpoint['inode'] is not None and (stat.st_ino != checkpoint['inode'] or stat.st_size < checkpoint['offset']):
+        print(f"Warning: {log_file} was truncated or rotated, starting over")
+        checkpoint.update(new_checkpoint(log_file))
+    checkpoint['inode'] = stat.st_ino
+
+    if stat.st_size <= checkpoint['offset']:
+        return b''
+
+    with open(log_file, 'rb') as f:
+        f.seek(checkpoint['offset'])
+        if checkpoint['header'] is None:
+            header_line = f.readline()
+            if not header_line.endswith(b'\n'):
+                return b''
+            checkpoint['encoding'] = candidate_encodings(log_file)[0]
+            # Parsed as CSV, so quoted column names come out as the full-file reader sees them
+            checkpoint['header'] = [str(col) for col in pd.read_csv(
+                io.BytesIO(header_line), nrows=0, encoding=checkpoint['encoding'], encoding_errors='replace').columns]
+            checkpoint['offset'] = f.tell()
+        chunks = [f.read(max_bytes)]
+        while chunks[-1] and b'\n' not in chunks[-1]:
+            chunks.append(f.read(max_bytes))
+        data = b''.join(chunks)
+
+    end = data.rfind(b'\n')
+    return data[:end + 1] if end >= 0 else b''
+
+def parse_lines(data, checkpoint):
+    """
+    Parse appended CSV lines with the header and encoding from the checkpoint
+    """
+    for encoding in [checkpoint['encoding'], FALLBACK_ENCODING]:
+        try:
+            return pd.read_csv(io.BytesIO(data), header=None, names=checkpoint['header'], encoding=encoding)
+        except UnicodeDecodeError:
+            continue
+    raise Exception("Could not decode the appended lines")
+
+def poll_log_file(log_file, checkpoint, model_components, batch_size=DEFAULT_BATCH_SIZE,
+                  max_bytes=DEFAULT_MAX_BYTES, recent_entries=DEFAULT_RECENT_ENTRIES):
+    """
+    Score the rows appended since the checkpoint and fold them into its aggregate
+
+    Returns the number of new rows. The checkpoint is updated in place; only
+    the new rows are read, so each poll costs O(new rows), not O(file size).
+    """
+    with perf_stage('read') as stage:
+        data = read_new_lines(log_file, checkpoint, max_bytes)
+        if not data:
+            return 0
+        df = parse_lines(data, checkpoint)
+        stage.add_rows(len(df))
+
+    if model_components is None or model_components['model'] is None:
+        generate_mock_predictions(df)
+    else:
+        score_dataframe(df, model_components, batch_size=batch_size, report=False)
+
+    with perf_stage('summarize') as stage:
+        result, aggregate = analyze_predictions(df)
+        stage.add_rows(len(df))
+    checkpoint['aggregate'] = merge_aggregates([checkpoint['aggregate'], aggregate])
+
+    entries = deque(checkpoint['recent_entries'], maxlen=recent_entries)
+    for entry in result['log_entries'][-recent_entries:]:
+        entry['recommendedAction'] = recommend_entry_action(entry)
+        entries.append(entry)
+    checkpoint['recent_entries'] = list(entries)
+
+    # Only advance past what was scored, so a crash before this point re-reads it
+    checkpoint['offset'] += len(data)
+    checkpoint['updated_at'] = datetime.now().isoformat()
+    return len(df)
+
+def build_follow_summary(checkpoint, new_rows, perf=None):
+    """
+    Summary JSON for the rows scored so far, in the usual file_summaries shape
+    """
+    # Only the recent entries are kept, so the totals come from the aggregate
+    file_summary = add_aggregate_totals(summary_from_aggregate(checkpoint['aggregate']), checkpoint['aggregate'])
+    file_summary['file_name'] = os.path.basename(checkpoint['log_file'])
+    file_summary['log_entries'] = checkpoint['recent_entries']
+    summary = {
+        'file_summaries': [file_summary],
+        'timestamp': datetime.now().isoformat(),
+        'follow': {
+            'log_file': checkpoint['log_file'],
+            'offset': checkpoint['offset'],
+            'new_rows': new_rows,
+        },
+    }
+    if perf is not None:
+        summary['perf'] = perf
+    return summary
+
+def follow_log(log_file, summary_file, checkpoint_file=None, model_components=None, interval=DEFAULT_INTERVAL,
+               batch_size=DEFAULT_BATCH_SIZE, max_bytes=DEFAULT_MAX_BYTES, recent_entries=DEFAULT_RECENT_ENTRIES,
+               once=False, indent=DEFAULT_INDENT):
+    """
+    Tail a growing CSV log, scoring appended rows and rewriting summary_file
+
+    summary_file is written like run_analysis writes summaries: gzipped when
+    it ends in .gz, and without whitespace when indent is 0 or None.
+
+    The byte offset, header and aggregates are saved to checkpoint_file after
+    every poll that found new rows, so a restart continues where it stopped
+    instead of rescoring history. With once=True everything appended so far
+    is scored and the function returns, for running from cron.
+    """
+    checkpoint_file = checkpoint_file or get_checkpoint_path(log_file)
+    if model_components is None:
+        model_components = load_default_model()
+
+    checkpoint = load_checkpoint(checkpoint_file, log_file)
+    print(f"Following {log_file} from byte {checkpoint['offset']} "
+          f"({checkpoint['aggregate']['total_records']} rows already scored)")
+
+    try:
+        while True:
+            # Drain everything available before sleeping, max_bytes at a time
+            while True:
+                try:
+                    with PerfRun() as perf_run:
+                        new_rows = poll_log_file(log_file, checkpoint, model_components, batch_size=batch_size,
+                                                 max_bytes=max_bytes, recent_entries=recent_entries)
+                except Exception as e:
+                    # The checkpoint is untouched, so the same rows are retried next poll
+                    print(f"Error scoring new rows of {log_file}: {str(e)}")
+                    checkpoint = load_checkpoint(checkpoint_file, log_file)
+                    break
+                if not new_rows:
+                    break
+                write_json_atomic(checkpoint, checkpoint_file)
+                write_summary(build_follow_summary(checkpoint, new_rows, perf_run.as_dict()), summary_file,
+                              indent=indent)
+                print(f"Scored {new_rows} new rows ({checkpoint['aggregate']['total_records']} total), "
+                      f"summary saved to: {summary_file}")
+
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped following")
+
+    if not os.path.exists(summary_file):
+        write_summary(build_follow_summary(checkpoint, 0), summary_file, indent=indent)
+    return checkpoint
+
+def main():
+    parser = argparse.ArgumentParser(description='Score rows as they are appended to a CSV log')
+    parser.add_argument('--log-file', type=str, required=True, help='Path to the growing CSV log')
+    parser.add_argument('--summary-file', type=str, default=None,
+                        help='Path of the summary JSON (default: summary.json next to the log)')
+    parser.add_argument('--checkpoint', type=str, default=None,
+                        help='Path of the checkpoint file (default: <log-file>.checkpoint.json)')
+    parser.add_argument('--model', type=str, default=None, help='Path to the model (default: bundled model)')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'Seconds between polls (default: {DEFAULT_INTERVAL})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows scored per model call')
+    parser.add_argument('--once', action='store_true', help='Score what has been appended, then exit')
+    parser.add_argument('--json-indent', type=int, default=DEFAULT_INDENT,
+                        help=f'Indentation of the summary JSON; 0 writes it without whitespace '
+                             f'(default: {DEFAULT_INDENT}). A --summary-file ending in .gz is gzipped')
+    args = parser.parse_args()
+
+    summary_file = args.summary_file or os.path.join(os.path.dirname(os.path.abspath(args.log_file)), 'summary.json')
+    model_components = load_model(args.model) if args.model else None
+    follow_log(args.log_file, summary_file, checkpoint_file=args.checkpoint, model_components=model_components,
+               interval=args.interval, batch_size=args.batch_size, once=args.once, indent=args.json_indent)
+
+if __name__ == "__main__":
+    main()
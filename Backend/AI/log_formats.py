@@ -0,0 +1,131 @@
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Table formats each pipeline stage can read and write, by file extension
+TABLE_FORMATS = {
+    'csv': '.csv',
+    'feather': '.feather',
+    'parquet': '.parquet',
+}
+
+def require_pyarrow(table_format):
+    """
+    Raise a clear error when a columnar format is used without pyarrow
+    """
+    if pa is None:
+        raise ImportError(f"pyarrow is required for the '{table_format}' format (pip install pyarrow)")
+
+def get_table_format(file_path):
+    """
+    Return the table format implied by a file's extension, or None
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.arrow':
+        return 'feather'
+    for table_format, format_extension in TABLE_FORMATS.items():
+        if extension == format_extension:
+            return table_format
+    return None
+
+def is_columnar(file_path):
+    """
+    True for Feather/Arrow IPC and Parquet files
+    """
+    return get_table_format(file_path) in ('feather', 'parquet')
+
+def read_table(file_path, **csv_kwargs):
+    """
+    Read a CSV, Feather or Parquet file into a DataFrame
+
+    csv_kwargs are only passed to pd.read_csv.
+    """
+    table_format = get_table_format(file_path)
+    if table_format == 'feather':
+        require_pyarrow(table_format)
+        return feather.read_feather(file_path, memory_map=True)
+    if table_format == 'parquet':
+        require_pyarrow(table_format)
+        return pq.read_table(file_path).to_pandas()
+    return pd.read_csv(file_path, **csv_kwargs)
+
+def write_table(df, file_path):
+    """
+    Write a DataFrame in the format implied by file_path's extension
+    """
+    table_format = get_table_format(file_path)
+    if table_format == 'feather':
+        require_pyarrow(table_format)
+        feather.write_feather(df.reset_index(drop=True), file_path)
+    elif table_format == 'parquet':
+        require_pyarrow(table_format)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), file_path)
+    else:
+        df.to_csv(file_path, index=False)
+
+def iter_table_chunks(file_path, chunk_size):
+    """
+    Yield a Feather or Parquet file as DataFrames of at most chunk_size rows
+    """
+    table_format = get_table_format(file_path)
+    require_pyarrow(table_format)
+    if table_format == 'parquet':
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # Memory-mapped, so only the rows of the current chunk are materialized
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for start in range(0, batch.num_rows, chunk_size):
+                    yield batch.slice(start, chunk_size).to_pandas()
+
+class ChunkedTableWriter:
+    """
+    Append DataFrame chunks to a CSV, Feather or Parquet file
+
+    Columnar files take their schema from the first chunk and later chunks
+    are cast to it, so a chunk whose column happens to be all null still fits.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.table_format = get_table_format(file_path) or 'csv'
+        if self.table_format != 'csv':
+            require_pyarrow(self.table_format)
+        self.writer = None
+        self.schema = None
+        self.rows = 0
+
+    def write(self, df):
+        if self.table_format == 'csv':
+            df.to_csv(self.file_path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        else:
+            if self.schema is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self.schema = table.schema
+                if self.table_format == 'parquet':
+                    self.writer = pq.ParquetWriter(self.file_path, self.schema)
+                else:
+                    self.writer = pa.ipc.new_file(self.file_path, self.schema)
+            else:
+                table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            self.writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
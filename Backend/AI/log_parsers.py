@@ -0,0 +1,264 @@
+import io
+import re
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+except ImportError:
+    pa = None
+
+# Non-empty lines looked at when guessing a log's format
+SNIFF_LINES = 20
+
+# Share of sniffed lines a parser must match to be picked
+SNIFF_THRESHOLD = 0.8
+
+# Parsers by name, tried in this order when sniffing; csv is the fallback
+LOG_PARSERS = {}
+
+# BSD syslog (RFC 3164) with a classic or ISO 8601 timestamp, e.g.
+# Oct 11 22:14:15 host sshd[4242]: Failed password for root from 10.0.0.5 port 22 ssh2
+SYSLOG_PATTERN = re.compile(
+    r'^(?:<(?P<priority>\d{1,3})>)?'
+    r'(?P<timestamp>[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}|\d{4}-\d{2}-\d{2}T[^ \n]+) '
+    r'(?P<host>[^ \n]+) '
+    r'(?P<program>[^ \n\[:]+)(?:\[(?P<pid>\d+)\])?: ?'
+    r'(?P<message>[^\n]*)$', re.M)
+
+# Apache/Nginx common and combined access logs, e.g.
+# 10.0.0.5 - frank [10/Oct/2000:13:55:36 -0700] "GET /a.gif HTTP/1.0" 200 2326 "http://x/" "Mozilla/4.08"
+ACCESS_LOG_PATTERN = re.compile(
+    r'^(?P<src_ip>[^ \n]+) (?P<ident>[^ \n]+) (?P<user>[^ \n]+) \[(?P<timestamp>[^\]\n]+)\] '
+    r'"(?:(?P<method>[A-Z]+) (?P<path>[^ "\n]+)(?: (?P<http_version>[^"\n]*))?|[^"\n]*)" '
+    r'(?P<status>\d{3}) (?P<bytes>\d+|-)'
+    r'(?: "(?P<referrer>[^"\n]*)" "(?P<user_agent>[^"\n]*)")?[^\n]*$', re.M)
+
+# Client address and port in sshd, su, sudo and pam messages
+SYSLOG_CLIENT_PATTERN = r'(?:from |rhost=)(?P<src_ip>\d{1,3}(?:\.\d{1,3}){3})(?: port (?P<src_port>\d+))?'
+SYSLOG_SUCCESS_PATTERN = r'Accepted |session opened'
+SYSLOG_FAILURE_PATTERN = r'Failed |Invalid user|authentication failure|FAILED'
+
+# Programs mapped onto the service names the model knows; others keep their name
+SERVICE_BY_PROGRAM = {
+    'sshd': 'ssh',
+    'ftpd': 'ftp',
+    'vsftpd': 'ftp',
+    'proftpd': 'ftp',
+    'postfix': 'smtp',
+    'sendmail': 'smtp',
+    'exim': 'smtp',
+    'named': 'domain_u',
+    'telnetd': 'telnet',
+    'httpd': 'http',
+    'nginx': 'http',
+    'apache2': 'http',
+}
+
+# NDJSON field names renamed to the redhawk_dataset columns the adapter reads
+NDJSON_FIELD_ALIASES = {
+    '@timestamp': 'timestamp',
+    'time': 'timestamp',
+    'ts': 'timestamp',
+    'source_ip': 'src_ip',
+    'src': 'src_ip',
+    'client_ip': 'src_ip',
+    'remote_addr': 'src_ip',
+    'destination_ip': 'dst_ip',
+    'dest_ip': 'dst_ip',
+    'dst': 'dst_ip',
+    'source_port': 'src_port',
+    'destination_port': 'dst_port',
+    'dest_port': 'dst_port',
+    'proto': 'protocol',
+}
+
+def register_log_parser(name, matches, parse):
+    """
+    Add a parser for a line-oriented log format
+
+    matches(line) says whether one line looks like the format; parse(text)
+    turns a block of complete lines into a DataFrame.
+    """
+    LOG_PARSERS[name] = {'matches': matches, 'parse': parse}
+
+def to_int(series):
+    """
+    Numeric column with '-' and other junk as 0
+    """
+    return pd.to_numeric(series, errors='coerce').fillna(0).astype('int64')
+
+def extract_lines(pattern, text, optional=()):
+    """
+    Run a multiline pattern over text and return one column per named group
+
+    One findall over the whole block keeps the per-line work in C. Lines the
+    pattern does not match are dropped with a warning.
+    """
+    rows = pattern.findall(text)
+    columns = list(pattern.groupindex)
+    df = pd.DataFrame(rows, columns=columns) if rows else pd.DataFrame(columns=columns, dtype=object)
+    skipped = text.count('\n') - len(rows)
+    if skipped > 0:
+        print(f"Warning: skipped {skipped} lines that did not match the log format")
+    # findall gives '' for optional groups that did not take part in the match
+    for column in optional:
+        values = df[column].to_numpy()
+        df[column] = np.where(values == '', None, values)
+    return df
+
+def parse_syslog_timestamps(values):
+    """
+    Parse classic syslog timestamps, which have no year, and ISO 8601 ones
+    """
+    timestamps = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    iso = values.str.contains('T', regex=False, na=False)
+    if iso.any():
+        parsed = pd.to_datetime(values[iso], format='ISO8601', errors='coerce', utc=True)
+        timestamps[iso] = parsed.dt.tz_localize(None)
+    if (~iso).any():
+        # Classic timestamps are taken to be from the current year
+        year = str(datetime.now().year) + ' '
+        timestamps[~iso] = pd.to_datetime(year + values[~iso], format='%Y %b %d %H:%M:%S', errors='coerce')
+    return timestamps
+
+def parse_syslog(text):
+    df = extract_lines(SYSLOG_PATTERN, text, optional=['priority', 'pid'])
+    df['timestamp'] = parse_syslog_timestamps(df['timestamp'])
+    df['priority'] = pd.to_numeric(df['priority'], errors='coerce').astype('Int64')
+    df['pid'] = pd.to_numeric(df['pid'], errors='coerce').astype('Int64')
+
+    messages = df['message'].fillna('')
+    client = messages.str.extract(SYSLOG_CLIENT_PATTERN)
+    df['src_ip'] = client['src_ip']
+    # Nullable, so lines without a client port stay out of the port counts
+    df['src_port'] = pd.to_numeric(client['src_port'], errors='coerce').astype('Int64')
+    programs = df['program'].str.lower()
+    df['service'] = programs.map(SERVICE_BY_PROGRAM).fillna(programs)
+    df['auth_result'] = np.select(
+        [messages.str.contains(SYSLOG_SUCCESS_PATTERN), messages.str.contains(SYSLOG_FAILURE_PATTERN)],
+        ['success', 'failure'], default=None).astype(object)
+    return df
+
+def parse_access_log(text):
+    df = extract_lines(ACCESS_LOG_PATTERN, text,
+                       optional=['method', 'path', 'http_version', 'referrer', 'user_agent'])
+    # Offsets differ between lines, so normalize to UTC and drop the zone
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='%d/%b/%Y:%H:%M:%S %z',
+                                     errors='coerce', utc=True).dt.tz_localize(None)
+    df['status'] = to_int(df['status'])
+    df['bytes'] = to_int(df['bytes'])
+    df['protocol'] = 'tcp'
+    df['service'] = 'http'
+    return df
+
+def read_ndjson(text):
+    """
+    Read NDJSON into a DataFrame, with pyarrow's multithreaded reader when installed
+    """
+    if pa is not None:
+        try:
+            return pa_json.read_json(io.BytesIO(text.encode('utf-8'))).to_pandas()
+        except pa.ArrowInvalid:
+            # A field changing type or a bad line; pandas is slower but more forgiving
+            pass
+    try:
+        return pd.read_json(io.StringIO(text), lines=True)
+    except ValueError:
+        # A bad line fails the whole block; fall back to line by line
+        records = []
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        print(f"Warning: skipped {text.count(chr(10)) - len(records)} lines that are not JSON objects")
+        return pd.DataFrame.from_records(records)
+
+def parse_ndjson(text):
+    df = read_ndjson(text)
+    renames = {name: alias for name, alias in NDJSON_FIELD_ALIASES.items()
+               if name in df.columns and alias not in df.columns}
+    df = df.rename(columns=renames)
+
+    if 'timestamp' in df.columns:
+        timestamps = df['timestamp']
+        if pd.api.types.is_numeric_dtype(timestamps):
+            # Epoch seconds, or milliseconds for values past the year 5000
+            unit = 'ms' if timestamps.abs().max() > 1e11 else 's'
+            timestamps = pd.to_datetime(timestamps, unit=unit, errors='coerce')
+        elif not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, format='ISO8601', errors='coerce', utc=True)
+        if isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+            timestamps = timestamps.dt.tz_convert(None)
+        df['timestamp'] = timestamps.astype('datetime64[ns]')
+    return df
+
+def matches_ndjson(line):
+    if not line.lstrip().startswith('{'):
+        return False
+    try:
+        return isinstance(json.loads(line), dict)
+    except ValueError:
+        return False
+
+register_log_parser('ndjson', matches_ndjson, parse_ndjson)
+register_log_parser('access', lambda line: ACCESS_LOG_PATTERN.match(line) is not None, parse_access_log)
+register_log_parser('syslog', lambda line: SYSLOG_PATTERN.match(line) is not None, parse_syslog)
+
+def sniff_log_format(lines):
+    """
+    Name of the registered parser matching most of lines, or 'csv'
+    """
+    sample = [line.rstrip('\r\n') for line in lines if line.strip()]
+    if not sample:
+        return 'csv'
+    for name, parser in LOG_PARSERS.items():
+        matched = sum(1 for line in sample if parser['matches'](line))
+        if matched >= SNIFF_THRESHOLD * len(sample):
+            return name
+    return 'csv'
+
+def sniff_log_file(file_path, encoding, sample_lines=SNIFF_LINES):
+    with open(file_path, 'r', encoding=encoding) as f:
+        lines = [line for line in islice(f, sample_lines * 2) if line.strip()][:sample_lines]
+    return sniff_log_format(lines)
+
+def parse_log_text(text, log_format):
+    """
+    Parse complete lines of a sniffed format into a DataFrame
+    """
+    if not text.endswith('\n'):
+        text += '\n'
+    return LOG_PARSERS[log_format]['parse'](text)
+
+def read_log_text(file_path, encoding, log_format=None):
+    """
+    Read a whole text log with the parser for its format, sniffed if not given
+    """
+    log_format = log_format or sniff_log_file(file_path, encoding)
+    print(f"Reading {file_path} as {log_format}")
+    if log_format == 'csv':
+        return pd.read_csv(file_path, encoding=encoding)
+    with open(file_path, 'r', encoding=encoding) as f:
+        return parse_log_text(f.read(), log_format)
+
+def iter_log_chunks(file_path, encoding, chunk_size, log_format=None):
+    """
+    Yield a text log as DataFrames of at most chunk_size lines each
+    """
+    log_format = log_format or sniff_log_file(file_path, encoding)
+    print(f"Reading {file_path} as {log_format}")
+    if log_format == 'csv':
+        yield from pd.read_csv(file_path, encoding=encoding, chunksize=chunk_size)
+        return
+    with open(file_path, 'r', encoding=encoding) as f:
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                break
+            yield parse_log_text(''.join(lines), log_format)
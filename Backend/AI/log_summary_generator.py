@@ -1,11 +1,202 @@
 import os
 import argparse
+import warnings
+import numpy as np
 import pandas as pd
 import glob
 from datetime import datetime
 import json
 import sys
+import heapq
+from itertools import islice
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from log_formats import TABLE_FORMATS, is_columnar, iter_table_chunks, read_table
+from pipeline_perf import perf_stage
+from summary_writer import DEFAULT_INDENT, SummaryWriter
+
+ALERT_CATEGORIES = ['attack', 'anomaly', 'threat']
+TIMESTAMP_INDICATORS = ['time', 'date', 'timestamp']
+IP_INDICATORS = ['ip', 'source', 'src', 'address']
+PORT_INDICATORS = ['port', 'dst_port', 'src_port']
+RATE_SUFFIX = '_rate'
+SENSITIVITY_RANK = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+
+# Alert entries kept in a compact summary; the full list goes to the entries file
+DEFAULT_TOP_ENTRIES = 100
+# Entries per page of the entries file
+DEFAULT_PAGE_SIZE = 1000
+
+def find_columns(columns):
+    """
+    Locate the probability, timestamp, source IP and port columns once per file
+    """
+    def matching(indicators):
+        return [col for col in columns if any(indicator in col.lower() for indicator in indicators)]
+    
+    timestamp_cols = matching(TIMESTAMP_INDICATORS)
+    ip_cols = matching(IP_INDICATORS)
+    return {
+        'prob': [col for col in columns if col.startswith('prob_')],
+        'timestamp': timestamp_cols[0] if timestamp_cols else None,
+        'ip': ip_cols[0] if ip_cols else None,
+        # Rates such as the adapter's dst_host_same_src_port_rate mention a port but hold ratios
+        'port': [col for col in matching(PORT_INDICATORS) if not col.lower().endswith(RATE_SUFFIX)],
+    }
+
+def compute_sensitivity(prob_matrix):
+    """
+    HIGH if any class probability is above 0.9, MEDIUM above 0.7, otherwise LOW
+    """
+    if prob_matrix.shape[1] == 0:
+        return np.full(prob_matrix.shape[0], 'LOW', dtype=object)
+    high = (prob_matrix > 0.9).any(axis=1)
+    medium = (prob_matrix > 0.7).any(axis=1)
+    return np.where(high, 'HIGH', np.where(medium, 'MEDIUM', 'LOW')).astype(object)
+
+def parse_timestamp(value):
+    """
+    Parse a single timestamp the way the per-row analysis always did
+    """
+    try:
+        return pd.to_datetime(value).isoformat()
+    except Exception:
+        return None
+
+def format_timestamps(series):
+    """
+    Convert a timestamp column to ISO strings in one vectorized pass.
+    
+    Values the vectorized parser rejects (mixed formats, time zones) fall
+    back to parse_timestamp so the output matches row-by-row parsing.
+    """
+    result = pd.Series(None, index=series.index, dtype=object)
+    nulls = series.isna().to_numpy()
+    # pd.to_datetime(NaN) is NaT, whose isoformat() is 'NaT'; None raises instead
+    if nulls.any():
+        result[nulls] = ['NaT' if value is not None else None for value in series[nulls]]
+    
+    values = series[~nulls]
+    if values.empty:
+        return result.tolist()
+    
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            parsed = pd.to_datetime(values, errors='coerce')
+    except Exception:
+        parsed = pd.Series(pd.NaT, index=values.index)
+    
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype) or not pd.api.types.is_datetime64_dtype(parsed):
+        parsed = pd.Series(pd.NaT, index=values.index)
+    
+    ok = parsed.notna()
+    whole_seconds = ok & (parsed.dt.microsecond == 0) & (parsed.dt.nanosecond == 0)
+    result[whole_seconds[whole_seconds].index] = parsed[whole_seconds].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    fractional = ok & ~whole_seconds
+    result[fractional[fractional].index] = [ts.isoformat() for ts in parsed[fractional]]
+    
+    # Anything the vectorized parser could not handle is parsed per unique value
+    failed = values[~ok]
+    if not failed.empty:
+        cache = {}
+        result[failed.index] = [cache[value] if value in cache else cache.setdefault(value, parse_timestamp(value))
+                                for value in failed]
+    
+    return result.tolist()
+
+def count_ports(df, port_cols):
+    """
+    Count port values over all port columns.
+    
+    Keys keep the order in which a row-by-row, column-by-column scan would
+    first see them, so the resulting dict serializes exactly as before.
+    """
+    counts = {}
+    first_seen = {}
+    for col_index, col in enumerate(port_cols):
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        values = values.astype(str)
+        positions = pd.Series(np.arange(len(df)), index=df.index)[values.index]
+        firsts = positions.groupby(values.to_numpy(), sort=False).min()
+        for port, count in values.value_counts(sort=False).items():
+            counts[port] = counts.get(port, 0) + int(count)
+            order = int(firsts[port]) * len(port_cols) + col_index
+            if port not in first_seen or order < first_seen[port]:
+                first_seen[port] = order
+    return {port: counts[port] for port in sorted(counts, key=first_seen.get)}
+
+def analyze_predictions(df):
+    """
+    Summarize a scored DataFrame
+    
+    Returns the per-file result together with a compact aggregate (record,
+    category, sensitivity, status and port counts) that can be merged across
+    files without walking log_entries again.
+    """
+    # Basic statistics
+    total_records = len(df)
+    # In order of first appearance, which is what merged aggregates need to keep value_counts() ties
+    category_counts = df['predicted_category'].value_counts(sort=False)
+    prediction_counts = category_counts.sort_values(ascending=False).to_dict()
+    prediction_percentages = {k: round(v/total_records*100, 2) for k, v in prediction_counts.items()}
+    
+    # Resolve the interesting columns once, then work on whole columns
+    columns = find_columns(df.columns)
+    categories = df['predicted_category']
+    
+    sensitivity = compute_sensitivity(df[columns['prob']].to_numpy(dtype=float))
+    status = np.where(categories.isin(ALERT_CATEGORIES), 'ALERT', 'INFO').astype(object)
+    
+    if columns['timestamp']:
+        timestamps = format_timestamps(df[columns['timestamp']])
+    else:
+        timestamps = [None] * total_records
+    
+    if columns['ip']:
+        source_ips = df[columns['ip']].astype(str).tolist()
+    else:
+        source_ips = [None] * total_records
+    
+    log_entries = [
+        {
+            'timestamp': timestamp,
+            'source_ip': source_ip,
+            'type': category,
+            'sensitivity': level,
+            'status': state
+        }
+        for timestamp, source_ip, category, level, state
+        in zip(timestamps, source_ips, categories.tolist(), sensitivity.tolist(), status.tolist())
+    ]
+    
+    # Track ports for visualization
+    port_counts = count_ports(df, columns['port'])
+    
+    # Create summary result
+    result = {
+        'total_records': total_records,
+        'prediction_counts': prediction_counts,
+        'prediction_percentages': prediction_percentages,
+        'log_entries': log_entries,
+    }
+    
+    # Add port analysis if available
+    if port_counts:
+        result['port_analysis'] = port_counts
+    
+    aggregate = {
+        'total_records': total_records,
+        'prediction_counts': {str(k): int(v) for k, v in category_counts.items()},
+        'sensitivity_counts': {str(k): int(v) for k, v in zip(*np.unique(sensitivity.astype(str), return_counts=True))},
+        'status_counts': {str(k): int(v) for k, v in zip(*np.unique(status.astype(str), return_counts=True))},
+        'high_alerts': int(((sensitivity == 'HIGH') & (status == 'ALERT')).sum()),
+        'port_counts': port_counts,
+    }
+    
+    return result, aggregate
 
 def analyze_prediction_file(file_path):
     """
@@ -13,65 +204,12 @@ def analyze_prediction_file(file_path):
     """
     try:
         print(f"Analyzing: {file_path}")
-        df = pd.read_csv(file_path)
-        
-        # Basic statistics
-        total_records = len(df)
-        prediction_counts = df['predicted_category'].value_counts().to_dict()
-        prediction_percentages = {k: round(v/total_records*100, 2) for k, v in prediction_counts.items()}
-        
-        # Extract and analyze additional fields
-        log_entries = []
-        
-        # Track ports and vulnerability types for visualization
-        port_counts = Counter()
-        vulnerability_types = Counter()
-        
-        for _, row in df.iterrows():
-            entry = {
-                'timestamp': None,
-                'source_ip': None,
-                'type': row['predicted_category'],
-                'sensitivity': 'HIGH' if any(prob > 0.9 for prob in [row[col] for col in df.columns if col.startswith('prob_')]) else 'MEDIUM' if any(prob > 0.7 for prob in [row[col] for col in df.columns if col.startswith('prob_')]) else 'LOW',
-                'status': 'ALERT' if row['predicted_category'] in ['attack', 'anomaly', 'threat'] else 'INFO'
-            }
-            
-            # Try to find timestamp
-            timestamp_cols = [col for col in df.columns if any(time_indicator in col.lower() 
-                                                             for time_indicator in ['time', 'date', 'timestamp'])]
-            if timestamp_cols:
-                try:
-                    entry['timestamp'] = pd.to_datetime(row[timestamp_cols[0]]).isoformat()
-                except:
-                    pass
-            
-            # Try to find source IP
-            ip_cols = [col for col in df.columns if any(ip_indicator in col.lower() 
-                                                       for ip_indicator in ['ip', 'source', 'src', 'address'])]
-            if ip_cols:
-                entry['source_ip'] = str(row[ip_cols[0]])
-            
-            # Try to find port information (for visualization)
-            port_cols = [col for col in df.columns if any(port_indicator in col.lower() 
-                                                        for port_indicator in ['port', 'dst_port', 'src_port'])]
-            for port_col in port_cols:
-                if pd.notna(row[port_col]):
-                    port_counts[str(row[port_col])] += 1
-            
-            log_entries.append(entry)
-        
-        # Create summary result
-        result = {
-            'total_records': total_records,
-            'prediction_counts': prediction_counts,
-            'prediction_percentages': prediction_percentages,
-            'log_entries': log_entries,
-        }
-        
-        # Add port analysis if available
-        if port_counts:
-            result['port_analysis'] = dict(port_counts)
-            
+        with perf_stage('read_predictions') as stage:
+            df = read_table(file_path)
+            stage.add_rows(len(df))
+        with perf_stage('summarize') as stage:
+            result, _ = analyze_predictions(df)
+            stage.add_rows(len(df))
         return result
         
     except Exception as e:
@@ -80,6 +218,48 @@ def analyze_prediction_file(file_path):
         traceback.print_exc()
         return {}
 
+def summarize_prediction_file(file_path):
+    """
+    Analyze one prediction file and return (result, aggregate)
+    
+    This is the unit of work for --workers, so it only takes and returns
+    picklable values. A failed file yields ({}, None).
+    """
+    try:
+        print(f"Analyzing: {file_path}")
+        df = read_table(file_path)
+        result, aggregate = analyze_predictions(df)
+        result['file_name'] = os.path.basename(file_path)
+        return result, aggregate
+        
+    except Exception as e:
+        print(f"Error analyzing file {file_path}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {}, None
+
+def merge_aggregates(aggregates):
+    """
+    Combine per-file aggregates from summarize_prediction_file
+    """
+    merged = {
+        'total_records': 0,
+        'prediction_counts': Counter(),
+        'sensitivity_counts': Counter(),
+        'status_counts': Counter(),
+        'high_alerts': 0,
+        'port_counts': Counter(),
+    }
+    for aggregate in aggregates:
+        merged['total_records'] += aggregate['total_records']
+        merged['high_alerts'] += aggregate.get('high_alerts', 0)
+        for key in ['prediction_counts', 'sensitivity_counts', 'status_counts', 'port_counts']:
+            merged[key].update(aggregate[key])
+    
+    for key in ['prediction_counts', 'sensitivity_counts', 'status_counts', 'port_counts']:
+        merged[key] = dict(merged[key])
+    return merged
+
 def generate_text_summary(total_records, prediction_counts, prediction_percentages, 
                         high_count=0, medium_count=0, low_count=0):
     """
@@ -139,15 +319,295 @@ def generate_recommended_actions(prediction_counts, high_alerts=0, has_attack=Fa
     
     return recommendations
 
-def load_prediction_files(path, pattern="*_predictions_*.csv"):
+def sort_counts(counts):
+    """
+    Order counts most frequent first, with ties in the order value_counts()
+    leaves them, given counts in order of first appearance
+    """
+    return pd.Series(counts, dtype='int64').sort_values(ascending=False).to_dict()
+
+def summary_from_aggregate(aggregate):
+    """
+    Build a file summary (counts, percentages, ports, text summary and
+    recommended actions) from an aggregate alone, without log entries
+    
+    Categories are listed in the order value_counts() gives them.
+    """
+    total_records = aggregate['total_records']
+    prediction_counts = sort_counts(aggregate['prediction_counts'])
+    prediction_percentages = {k: round(v/total_records*100, 2) for k, v in prediction_counts.items()} if total_records else {}
+    sensitivity_counts = aggregate['sensitivity_counts']
+    
+    result = {
+        'total_records': total_records,
+        'prediction_counts': prediction_counts,
+        'prediction_percentages': prediction_percentages,
+    }
+    if aggregate['port_counts']:
+        result['port_analysis'] = dict(aggregate['port_counts'])
+    
+    result['text_summary'] = generate_text_summary(
+        total_records, prediction_counts, prediction_percentages,
+        high_count=sensitivity_counts.get('HIGH', 0),
+        medium_count=sensitivity_counts.get('MEDIUM', 0),
+        low_count=sensitivity_counts.get('LOW', 0)
+    )
+    result['recommended_actions'] = generate_recommended_actions(
+        prediction_counts,
+        high_alerts=aggregate.get('high_alerts', 0),
+        has_attack=prediction_counts.get('attack', 0) > 0,
+        has_probe=prediction_counts.get('probe', 0) > 0
+    )
+    return result
+
+def add_aggregate_totals(result, aggregate):
+    """
+    Add the sensitivity and alert totals compact_result adds, from an aggregate
+    """
+    sensitivity_counts = aggregate['sensitivity_counts']
+    result['sensitivity_counts'] = dict(sensitivity_counts)
+    result['alert_total'] = aggregate['status_counts'].get('ALERT', 0)
+    result['high_sensitivity_total'] = sensitivity_counts.get('HIGH', 0)
+    return result
+
+def recommend_entry_action(entry):
+    """
+    Pick the recommended action for a single log entry
+    """
+    if entry.get('type') == 'normal':
+        return "No action required"
+    elif entry.get('type') == 'probe' and entry.get('sensitivity') == 'LOW':
+        return "Monitor source IP for further suspicious activity"
+    elif entry.get('type') == 'probe':
+        return "Block source IP and investigate"
+    elif entry.get('type') == 'attack':
+        return "Immediately isolate affected systems and investigate"
+    elif entry.get('type') == 'anomaly':
+        return "Review unusual behavior and investigate further"
+    else:
+        return "Further investigation required"
+
+def add_recommendations(analysis_result):
+    """
+    Add the text summary, recommended actions and a per-entry recommendedAction
+    to an analysis result, as served by the /analyze-log route
+    """
+    log_entries = analysis_result.get('log_entries', [])
+    
+    analysis_result['text_summary'] = generate_text_summary(
+        analysis_result['total_records'],
+        analysis_result['prediction_counts'],
+        analysis_result['prediction_percentages'],
+        high_count=sum(1 for e in log_entries if e.get('sensitivity') == 'HIGH'),
+        medium_count=sum(1 for e in log_entries if e.get('sensitivity') == 'MEDIUM'),
+        low_count=sum(1 for e in log_entries if e.get('sensitivity') == 'LOW')
+    )
+    
+    analysis_result['recommended_actions'] = generate_recommended_actions(
+        analysis_result['prediction_counts'],
+        high_alerts=sum(1 for e in log_entries if e.get('sensitivity') == 'HIGH' and e.get('status') == 'ALERT'),
+        has_attack='attack' in analysis_result['prediction_counts'] and analysis_result['prediction_counts']['attack'] > 0,
+        has_probe='probe' in analysis_result['prediction_counts'] and analysis_result['prediction_counts']['probe'] > 0
+    )
+    
+    for entry in log_entries:
+        if 'recommendedAction' not in entry:
+            entry['recommendedAction'] = recommend_entry_action(entry)
+    
+    return analysis_result
+
+def get_entries_path(summary_file, name=None):
+    """
+    Path of the NDJSON entries file next to a summary, e.g. summary_entries.ndjson
+
+    A .gz summary's stem drops both suffixes, so summary.json.gz also gives
+    summary_entries.ndjson.
+    """
+    stem = summary_file[:-3] if summary_file.endswith('.gz') else summary_file
+    stem = os.path.splitext(stem)[0]
+    return f"{stem}_{name}_entries.ndjson" if name else f"{stem}_entries.ndjson"
+
+class EntriesFileWriter:
+    """
+    Append log entries to an NDJSON entries file, one entry per line
+    
+    page_offsets holds the byte offset at which each page of page_size
+    entries starts, so a page can be read with one seek.
+    """
+    def __init__(self, file_path, page_size=DEFAULT_PAGE_SIZE):
+        self.file_path = file_path
+        self.page_size = page_size
+        self.page_offsets = []
+        self.entries = 0
+        self.file = None
+    
+    def __enter__(self):
+        self.file = open(self.file_path, 'wb')
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+    
+    def write(self, log_entries):
+        start = 0
+        while start < len(log_entries):
+            if self.entries % self.page_size == 0:
+                self.page_offsets.append(self.file.tell())
+            # Up to the end of the current page
+            page = log_entries[start:start + self.page_size - self.entries % self.page_size]
+            self.file.write(''.join(json.dumps(entry) + '\n' for entry in page).encode('utf-8'))
+            start += len(page)
+            self.entries += len(page)
+
+def write_entries_file(log_entries, file_path, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Write log entries as NDJSON, one entry per line
+    
+    Returns the byte offset at which each page of page_size entries starts,
+    so a page can be read with one seek.
+    """
+    with EntriesFileWriter(file_path, page_size) as writer:
+        writer.write(log_entries)
+    return writer.page_offsets
+
+def iter_entry_batches(entries_file, batch_size=DEFAULT_PAGE_SIZE):
+    """
+    Yield the entries of an NDJSON entries file as lists of up to batch_size
+    """
+    with open(entries_file, 'rb') as f:
+        while True:
+            batch = [json.loads(line) for line in islice(f, batch_size)]
+            if not batch:
+                return
+            yield batch
+
+def read_entries_page(entries_file, page, page_size=DEFAULT_PAGE_SIZE, page_offsets=None):
+    """
+    Read one page (0-based) of an NDJSON entries file
+    
+    With the page_offsets recorded in the summary this seeks straight to the
+    page; without them the preceding lines are skipped.
+    """
+    with open(entries_file, 'rb') as f:
+        if page_offsets is not None:
+            if page >= len(page_offsets):
+                return []
+            f.seek(page_offsets[page])
+            lines = islice(f, page_size)
+        else:
+            lines = islice(f, page * page_size, (page + 1) * page_size)
+        return [json.loads(line) for line in lines]
+
+def entry_rank(entry):
+    """Sort key putting alerts first, then the most sensitive entries"""
+    return (entry.get('status') != 'ALERT', SENSITIVITY_RANK.get(entry.get('sensitivity'), len(SENSITIVITY_RANK)))
+
+def compact_result(result, entries_file=None, top_n=DEFAULT_TOP_ENTRIES, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Keep only the top_n entries of a result: alerts first, most sensitive first
+    
+    The counts stay exact: sensitivity and alert totals are added before the
+    entries are dropped. With entries_file the full list is written there as
+    NDJSON and described under 'entries_file'. Call after add_recommendations,
+    whose risk levels are counted over all entries.
+    """
+    log_entries = result.pop('log_entries', [])
+    sensitivity_counts = Counter(entry.get('sensitivity') for entry in log_entries)
+    statuses = Counter(entry.get('status') for entry in log_entries)
+    result['sensitivity_counts'] = {str(k): v for k, v in sensitivity_counts.items()}
+    result['alert_total'] = statuses.get('ALERT', 0)
+    result['high_sensitivity_total'] = sensitivity_counts.get('HIGH', 0)
+    
+    # Alerts first, then by sensitivity; nsmallest is stable, so ties stay in log order
+    result['log_entries'] = heapq.nsmallest(top_n, log_entries, key=entry_rank)
+    
+    if entries_file:
+        page_offsets = write_entries_file(log_entries, entries_file, page_size)
+        result['entries_file'] = {
+            'path': os.path.basename(entries_file),
+            'format': 'ndjson',
+            'total_entries': len(log_entries),
+            'page_size': page_size,
+            'page_offsets': page_offsets,
+        }
+    return result
+
+def iter_prediction_chunks(file_path, chunk_size):
+    """
+    Yield a CSV, Feather or Parquet predictions file as DataFrames of at most chunk_size rows
+    """
+    if is_columnar(file_path):
+        yield from iter_table_chunks(file_path, chunk_size)
+    else:
+        with pd.read_csv(file_path, chunksize=chunk_size) as chunks:
+            yield from chunks
+
+def summarize_prediction_chunks(file_path, chunk_size, entries_file, top_n=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Summarize a predictions file chunk by chunk, for files too large to load
+    
+    Only the aggregate and at most top_n entries are held in memory. Every
+    entry, with its recommendedAction, is written to entries_file as NDJSON.
+    With top_n the result is compact, as compact_result would leave it: it
+    keeps the top_n entries and describes entries_file. Without top_n its
+    log_entries is an iterator over entries_file for SummaryWriter to
+    stream, so entries_file must be kept until the summary is written.
+    """
+    aggregate = merge_aggregates([])
+    top_entries = []
+    chunks = iter_prediction_chunks(file_path, chunk_size)
+    with EntriesFileWriter(entries_file, page_size) as writer:
+        while True:
+            with perf_stage('read_predictions') as stage:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    stage.add_rows(len(chunk))
+            if chunk is None:
+                break
+            
+            with perf_stage('summarize') as stage:
+                result, chunk_aggregate = analyze_predictions(chunk)
+                aggregate = merge_aggregates([aggregate, chunk_aggregate])
+                log_entries = result['log_entries']
+                for entry in log_entries:
+                    entry['recommendedAction'] = recommend_entry_action(entry)
+                writer.write(log_entries)
+                if top_n is not None:
+                    # nsmallest is stable, so ties stay in log order across chunks
+                    top_entries = heapq.nsmallest(top_n, top_entries + log_entries, key=entry_rank)
+                stage.add_rows(len(chunk))
+    
+    summary = summary_from_aggregate(aggregate)
+    if top_n is None:
+        # log_entries goes where analyze_predictions puts it, so the keys match an in-memory summary
+        result = {key: summary.pop(key) for key in ['total_records', 'prediction_counts', 'prediction_percentages']}
+        result['log_entries'] = iter_entry_batches(entries_file, page_size)
+        result.update(summary)
+    else:
+        result = add_aggregate_totals(summary, aggregate)
+        result['log_entries'] = top_entries
+        result['entries_file'] = {
+            'path': os.path.basename(entries_file),
+            'format': 'ndjson',
+            'total_entries': writer.entries,
+            'page_size': page_size,
+            'page_offsets': writer.page_offsets,
+        }
+    return result
+
+def load_prediction_files(path, pattern=None):
     """
     Find and load all prediction files generated by the log analysis pipeline
+    
+    Without a pattern, CSV, Feather and Parquet prediction files are all found.
     """
     prediction_files = []
+    patterns = [pattern] if pattern else [f"*_predictions_*{extension}" for extension in TABLE_FORMATS.values()]
     
     # If path is a directory, search for files matching pattern
     if os.path.isdir(path):
-        prediction_files = glob.glob(os.path.join(path, pattern))
+        for file_pattern in patterns:
+            prediction_files.extend(sorted(glob.glob(os.path.join(path, file_pattern))))
     # If path is a file, use it directly
     elif os.path.isfile(path):
         prediction_files = [path]
@@ -163,6 +623,15 @@ def main():
     parser = argparse.ArgumentParser(description='Generate summary of security log analysis')
     parser.add_argument('--input', type=str, required=True, help='Path to input prediction file or directory')
     parser.add_argument('--output', type=str, help='Path to output JSON file')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes used to analyze files in parallel (0 = one per CPU core)')
+    parser.add_argument('--compact', action='store_true',
+                        help='Keep only the top alert entries per file; with --output the rest go to NDJSON files')
+    parser.add_argument('--top-entries', type=int, default=DEFAULT_TOP_ENTRIES,
+                        help=f'Alert entries kept per file with --compact (default: {DEFAULT_TOP_ENTRIES})')
+    parser.add_argument('--json-indent', type=int, default=DEFAULT_INDENT,
+                        help=f'Indentation of the summary JSON; 0 writes it without whitespace '
+                             f'(default: {DEFAULT_INDENT}). An --output ending in .gz is gzipped')
     args = parser.parse_args()
     
     prediction_files = load_prediction_files(args.input)
@@ -171,48 +640,68 @@ def main():
         print("No prediction files found. Exiting.")
         sys.exit(1)
     
-    file_summaries = []
-    
-    for file_path in prediction_files:
-        analysis_result = analyze_prediction_file(file_path)
-        if analysis_result:
-            analysis_result['file_name'] = os.path.basename(file_path)
-            file_summaries.append(analysis_result)
+    # Analyze files in a process pool when asked; map keeps the input order
+    # and yields each result as soon as it and the ones before it are done
+    workers = min(args.workers or os.cpu_count() or 1, len(prediction_files))
+    executor = None
+    if workers > 1:
+        print(f"Analyzing {len(prediction_files)} files with {workers} worker processes")
+        executor = ProcessPoolExecutor(max_workers=workers)
+        analyses = executor.map(summarize_prediction_file, prediction_files)
+    else:
+        analyses = (summarize_prediction_file(file_path) for file_path in prediction_files)
     
-    if not file_summaries:
-        print("No valid analysis results generated. Exiting.")
-        sys.exit(1)
+    aggregates = []
     
-    # Calculate total stats
-    total_records = sum(summary['total_records'] for summary in file_summaries)
-    total_high_sensitivity = sum(
-        sum(1 for entry in summary.get('log_entries', []) if entry.get('sensitivity') == 'HIGH')
-        for summary in file_summaries
-    )
-    total_alerts = sum(
-        sum(1 for entry in summary.get('log_entries', []) if entry.get('status') == 'ALERT')
-        for summary in file_summaries
-    )
+    def file_summaries():
+        for result, aggregate in analyses:
+            if not result:
+                continue
+            if args.compact:
+                entries_file = None
+                if args.output:
+                    entries_file = get_entries_path(args.output, os.path.splitext(result['file_name'])[0])
+                compact_result(result, entries_file=entries_file, top_n=args.top_entries)
+            aggregates.append(aggregate)
+            yield result
     
-    # Generate output
-    output = {
-        'generated_at': datetime.now().isoformat(),
-        'file_summaries': file_summaries,
-        'meta': {
-            'total_files_analyzed': len(file_summaries),
-            'total_records_analyzed': total_records,
-            'high_sensitivity_total': total_high_sensitivity,
-            'alert_status_total': total_alerts
+    def meta():
+        # Calculate total stats from the per-file aggregates
+        totals = merge_aggregates(aggregates)
+        return {
+            'total_files_analyzed': len(aggregates),
+            'total_records_analyzed': totals['total_records'],
+            'high_sensitivity_total': totals['sensitivity_counts'].get('HIGH', 0),
+            'alert_status_total': totals['status_counts'].get('ALERT', 0),
+            'prediction_counts': sort_counts(totals['prediction_counts']),
+            'port_analysis': totals['port_counts']
         }
-    }
     
-    # Save to file if output path provided
-    if args.output:
-        with open(args.output, 'w') as f:
-            json.dump(output, f, indent=2)
-        print(f"Summary saved to: {args.output}")
-    else:
-        print(json.dumps(output, indent=2))
+    try:
+        if args.output:
+            # Each file summary is written and dropped before the next is analyzed
+            with SummaryWriter(args.output, indent=args.json_indent) as writer:
+                writer.write_field('generated_at', datetime.now().isoformat())
+                writer.write_file_summaries(file_summaries())
+                if not aggregates:
+                    print("No valid analysis results generated. Exiting.")
+                    sys.exit(1)
+                writer.write_field('meta', meta())
+            print(f"Summary saved to: {args.output}")
+        else:
+            output = {
+                'generated_at': datetime.now().isoformat(),
+                'file_summaries': list(file_summaries()),
+            }
+            if not aggregates:
+                print("No valid analysis results generated. Exiting.")
+                sys.exit(1)
+            output['meta'] = meta()
+            print(json.dumps(output, indent=args.json_indent or None,
+                             separators=None if args.json_indent else (',', ':')))
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
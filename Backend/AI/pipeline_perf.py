@@ -0,0 +1,202 @@
+import os
+import sys
+import time
+import cProfile
+import threading
+import contextvars
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Set to a file path to write a cProfile dump of run_analysis.py, e.g.
+# REDHAWK_PROFILE=/tmp/analysis.prof, then: python -m pstats /tmp/analysis.prof
+PROFILE_ENV_VAR = 'REDHAWK_PROFILE'
+
+# Seconds between memory samples while a run is active
+SAMPLE_INTERVAL = 0.05
+
+# The run the pipeline functions record into; each thread sees its own
+_current_run = contextvars.ContextVar('redhawk_perf_run', default=None)
+
+def current_rss_mb():
+    """
+    Current resident set size of this process in MB, or None where unsupported
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        # No procfs (macOS, Windows); the peak is the best we have
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB, or None where unsupported
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+class PerfStage:
+    """
+    Timings and counters of one named stage, summed over all its calls
+    """
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = None
+        self.peak_rss_mb = None
+        self.extra = {}
+
+    def add_rows(self, rows):
+        self.rows = (self.rows or 0) + int(rows)
+
+    def set(self, key, value):
+        """Attach an extra value, e.g. the number of encoding attempts"""
+        self.extra[key] = value
+
+    def sample(self, rss_mb):
+        if rss_mb is not None and (self.peak_rss_mb is None or rss_mb > self.peak_rss_mb):
+            self.peak_rss_mb = rss_mb
+
+    def as_dict(self):
+        stage = {'seconds': round(self.seconds, 4), 'calls': self.calls}
+        if self.rows is not None:
+            stage['rows'] = self.rows
+            if self.seconds > 0:
+                stage['rows_per_second'] = round(self.rows / self.seconds, 2)
+        if self.peak_rss_mb is not None:
+            stage['peak_rss_mb'] = round(self.peak_rss_mb, 1)
+        stage.update(self.extra)
+        return stage
+
+class PerfRun:
+    """
+    Collects per-stage timers, row counters and memory samples for one analysis
+
+    Used as a context manager around the work; the pipeline's perf_stage() calls
+    made inside it record here, and as_dict() gives the summary's perf block.
+    A background thread samples RSS every sample_interval seconds and charges
+    it to the stages active at the time, so nested stages all see the peak.
+    RSS is process-wide, so concurrent runs in one process share it.
+    """
+    def __init__(self, sample_interval=SAMPLE_INTERVAL):
+        self.sample_interval = sample_interval
+        self.stages = {}
+        self.active = []
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.sampler = None
+        self.token = None
+        self.start_time = None
+        self.end_time = None
+        self.peak_sampled_mb = None
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        self.token = _current_run.set(self)
+        self.sampler = threading.Thread(target=self.sample_loop, daemon=True)
+        self.sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        self.sampler.join()
+        _current_run.reset(self.token)
+        self.end_time = time.perf_counter()
+
+    def sample_loop(self):
+        while not self.stopped.wait(self.sample_interval):
+            self.sample()
+
+    def sample(self):
+        rss_mb = current_rss_mb()
+        with self.lock:
+            if rss_mb is not None and (self.peak_sampled_mb is None or rss_mb > self.peak_sampled_mb):
+                self.peak_sampled_mb = rss_mb
+            for stage in self.active:
+                stage.sample(rss_mb)
+
+    def record(self, name):
+        """Return the PerfStage for name, creating it on first use"""
+        with self.lock:
+            record = self.stages.get(name)
+            if record is None:
+                record = self.stages[name] = PerfStage(name)
+            return record
+
+    @contextmanager
+    def stage(self, name):
+        record = self.record(name)
+        with self.lock:
+            self.active.append(record)
+        # Sample on entry and exit too, so stages shorter than the interval get a value
+        self.sample()
+        start_time = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds += time.perf_counter() - start_time
+            record.calls += 1
+            self.sample()
+            with self.lock:
+                self.active.remove(record)
+
+    def as_dict(self):
+        end_time = self.end_time or time.perf_counter()
+        with self.lock:
+            peak = self.peak_sampled_mb
+            return {
+                'total_seconds': round(end_time - self.start_time, 4),
+                'peak_rss_mb': round(peak, 1) if peak is not None else None,
+                'stages': {name: stage.as_dict() for name, stage in self.stages.items()},
+            }
+
+@contextmanager
+def perf_stage(name):
+    """
+    Time a pipeline stage in the current run
+
+    Yields a PerfStage to add rows or extra values to; outside a run the
+    stage is recorded nowhere and this costs next to nothing.
+    """
+    run = _current_run.get()
+    if run is None:
+        yield PerfStage(name)
+        return
+    with run.stage(name) as record:
+        yield record
+
+def perf_set(name, key, value):
+    """
+    Attach a value to a stage of the current run without timing anything
+    """
+    run = _current_run.get()
+    if run is not None:
+        run.record(name).set(key, value)
+
+@contextmanager
+def profile_to(path):
+    """
+    Profile the enclosed code with cProfile and dump the stats to path
+
+    Does nothing when path is empty.
+    """
+    if not path:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"Profile saved to: {path} (inspect with: python -m pstats {path})")
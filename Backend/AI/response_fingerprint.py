@@ -0,0 +1,45 @@
+# Probes whose word-set similarity to the baseline falls below this are a significant change
+DEFAULT_SIMILARITY_THRESHOLD = 0.7
+
+def tokenize(text, lowered=False):
+    """The set of lowercased whitespace-separated words of a response body"""
+    return frozenset((text if lowered else text.lower()).split())
+
+class ResponseFingerprint:
+    """
+    A baseline response's word set, built once and compared with every probe
+
+    similarity() is the Jaccard index of the two bodies' lowercased words,
+    the measure scan_website has always used, so verdicts are unchanged.
+    The baseline is tokenized once instead of twice per probe, and the
+    union size follows from the set sizes, so each probe costs one
+    tokenization and one intersection. When the set sizes alone put the
+    index below the threshold (it is at most smaller / larger), the
+    intersection is skipped too.
+    """
+    def __init__(self, text, threshold=DEFAULT_SIMILARITY_THRESHOLD):
+        self.empty = not text
+        self.tokens = tokenize(text or "")
+        self.threshold = threshold
+
+    def similarity(self, tokens):
+        """Jaccard index of the baseline's words and tokens, or None when both are empty"""
+        common = len(self.tokens & tokens)
+        total = len(self.tokens) + len(tokens) - common
+        return common / total if total > 0 else None
+
+    def differs(self, text, lowered=False):
+        """
+        Whether a probe body is less than threshold similar to the baseline
+
+        An empty baseline or body is never compared, as before. Pass
+        lowered=True when text is already lowercase to skip the copy.
+        """
+        if self.empty or not text:
+            return False
+        tokens = tokenize(text, lowered)
+        smaller, larger = sorted([len(self.tokens), len(tokens)])
+        if larger and smaller / larger < self.threshold:
+            return True
+        similarity = self.similarity(tokens)
+        return similarity is not None and similarity < self.threshold
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+# Where cached results live unless REDHAWK_CACHE_DIR or a cache_dir is given
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'results')
+CACHE_DIR_ENV_VAR = 'REDHAWK_CACHE_DIR'
+
+# Total size of all entries before the least recently used ones are evicted
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Bytes hashed per read
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Bump when the summary format changes, so old entries stop matching
+CACHE_FORMAT = 1
+
+SUMMARY_NAME = 'summary.json'
+META_NAME = 'meta.json'
+
+def hash_file(file_path, block_size=HASH_BLOCK_SIZE):
+    """
+    SHA-256 of a file's bytes, read in blocks so memory stays flat
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_entry_size(entry_dir):
+    return sum(os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir))
+
+class ResultCache:
+    """
+    Content-addressed cache of analysis results on disk
+
+    Each entry is a directory named after its key, holding the summary JSON,
+    optional predictions and entries files and a small meta.json. An entry's mtime is
+    its last use; when the entries together exceed max_bytes the least
+    recently used are removed. Entries are assembled in a temporary
+    directory and renamed into place, so concurrent runs never see half an
+    entry.
+    """
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV_VAR) or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, input_path, model_path, options=None):
+        """
+        Key for analyzing input_path with the model at model_path
+
+        Both files are hashed by content, so renaming or re-uploading the
+        same bytes hits the cache and retraining the model misses it.
+        options holds anything else that changes the stored files.
+        """
+        key_data = {
+            'format': CACHE_FORMAT,
+            'input': hash_file(input_path),
+            'model': hash_file(model_path) if model_path and os.path.exists(model_path) else None,
+            'options': options or {},
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get_entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key):
+        """
+        Return {'summary': path, 'predictions': path or None, 'entries': path or None}
+        for a cached key, or None
+        """
+        entry_dir = self.get_entry_dir(key)
+        summary_path = os.path.join(entry_dir, SUMMARY_NAME)
+        if not os.path.exists(summary_path):
+            return None
+        try:
+            with open(os.path.join(entry_dir, META_NAME), 'r') as f:
+                meta = json.load(f)
+            # Mark as recently used
+            os.utime(entry_dir)
+        except (OSError, ValueError) as e:
+            print(f"Error reading cache entry {key}: {str(e)}")
+            return None
+        predictions = meta.get('predictions')
+        entries = meta.get('entries')
+        return {
+            'summary': summary_path,
+            'predictions': os.path.join(entry_dir, predictions) if predictions else None,
+            'entries': os.path.join(entry_dir, entries) if entries else None,
+        }
+
+    def store(self, key, summary_file, predictions_file=None, entries_file=None):
+        """
+        Copy a finished run's summary (and predictions and entries files) into the cache
+        """
+        entry_dir = self.get_entry_dir(key)
+        if os.path.exists(entry_dir):
+            return entry_dir
+
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.cache_dir)
+        try:
+            shutil.copyfile(summary_file, os.path.join(tmp_dir, SUMMARY_NAME))
+            meta = {'created_at': time.time(), 'predictions': None, 'entries': None}
+            for name, file_path in [('predictions', predictions_file), ('entries', entries_file)]:
+                if file_path and os.path.exists(file_path):
+                    cached_name = name + os.path.splitext(file_path)[1]
+                    shutil.copyfile(file_path, os.path.join(tmp_dir, cached_name))
+                    meta[name] = cached_name
+            with open(os.path.join(tmp_dir, META_NAME), 'w') as f:
+                json.dump(meta, f)
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another run stored the same key first, or the disk is full
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.exists(entry_dir):
+                raise
+
+        self.evict()
+        return entry_dir
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if name.startswith('.tmp-') or not os.path.isdir(entry_dir):
+                continue
+            try:
+                entries.append((os.path.getmtime(entry_dir), get_entry_size(entry_dir), entry_dir))
+            except OSError:
+                continue
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
+            print(f"Evicted cached result {os.path.basename(entry_dir)} ({size / (1024 * 1024):.1f} MB)")
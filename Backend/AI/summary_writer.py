@@ -0,0 +1,174 @@
+import os
+import json
+import gzip
+import threading
+
+# Indentation of summary files unless asked otherwise, as json.dump(..., indent=2) wrote them
+DEFAULT_INDENT = 2
+
+# gzip level for .gz summaries; 9 is several times slower for a few percent
+GZIP_LEVEL = 6
+
+# Log entries encoded per write
+ENTRY_BATCH_SIZE = 1000
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def open_summary_file(path, mode='r'):
+    """
+    Open a summary for text reading or writing, through gzip when it is compressed
+
+    Writing compresses when path ends in .gz, the suffix RedHawkAssistant
+    looks for; reading checks the file's first bytes instead, so a cached
+    copy under another name still opens.
+    """
+    if 'w' in mode:
+        if path.endswith('.gz'):
+            return gzip.open(path, 'wt', encoding='utf-8', compresslevel=GZIP_LEVEL)
+        return open(path, 'w', encoding='utf-8')
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    return gzip.open(path, 'rt', encoding='utf-8') if compressed else open(path, 'r', encoding='utf-8')
+
+def get_temp_path(path):
+    """
+    Temporary name to write path under, unique to this process and thread
+
+    Two runs writing the same summary at once each get their own file, so
+    neither renames or removes the other's. A .gz suffix is kept, so the
+    temporary file is compressed too.
+    """
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    if path.endswith('.gz'):
+        return f"{path[:-3]}{suffix}.gz"
+    return f"{path}{suffix}"
+
+def read_summary(path):
+    with open_summary_file(path) as f:
+        return json.load(f)
+
+class SummaryWriter:
+    """
+    Write a summary JSON object one top-level key at a time
+
+    file_summaries can be passed as a generator and each file's log_entries
+    are encoded in batches, so neither the whole document nor its text is
+    held in memory at once. With indent the bytes match
+    json.dump(summary, f, indent=indent); with indent=None the output has no
+    whitespace at all. The file is written under a temporary name and
+    renamed into place when the writer closes without an error.
+    """
+    def __init__(self, path, indent=DEFAULT_INDENT):
+        self.path = path
+        self.indent = indent or None
+        self.tmp_path = get_temp_path(path)
+        self.item_separator = ','
+        if self.indent:
+            self.encoder = json.JSONEncoder(indent=self.indent)
+            self.key_separator = ': '
+        else:
+            self.encoder = json.JSONEncoder(separators=(',', ':'))
+            self.key_separator = ':'
+        self.file = None
+        self.first_key = True
+
+    def __enter__(self):
+        self.file = open_summary_file(self.tmp_path, 'w')
+        self.file.write('{')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.file.write(('' if self.first_key else self.newline(0)) + '}')
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+    def newline(self, level):
+        return '\n' + ' ' * (self.indent * level) if self.indent else ''
+
+    def encode(self, value, level):
+        """Encode value as it would appear nested level deep"""
+        text = self.encoder.encode(value)
+        # Strings never contain raw newlines, so these are all indentation
+        return text.replace('\n', self.newline(level)) if self.indent and level else text
+
+    def key_prefix(self, key, level, first):
+        separator = '' if first else self.item_separator
+        return f"{separator}{self.newline(level)}{json.dumps(key)}{self.key_separator}"
+
+    def write_field(self, key, value):
+        """Write one top-level key"""
+        self.file.write(self.key_prefix(key, 1, self.first_key) + self.encode(value, 1))
+        self.first_key = False
+
+    def write_list(self, items, level, write_item):
+        """Stream a JSON array whose items are written by write_item(item, level)"""
+        self.file.write('[')
+        empty = True
+        for item in items:
+            if not empty:
+                self.file.write(self.item_separator)
+            self.file.write(self.newline(level + 1))
+            write_item(item, level + 1)
+            empty = False
+        if not empty:
+            self.file.write(self.newline(level))
+        self.file.write(']')
+
+    def write_entry_batches(self, batches, level):
+        """Stream a log_entries list given as an iterable of lists of entries"""
+        empty = True
+        for batch in batches:
+            if not batch:
+                continue
+            self.file.write('[' if empty else self.item_separator)
+            # Encode the batch as one list and drop its brackets, one encoder call per batch
+            text = self.encode(batch, level)
+            self.file.write(text[1:-(len(self.newline(level)) + 1)])
+            empty = False
+        self.file.write('[]' if empty else self.newline(level) + ']')
+
+    def write_entries(self, entries, level):
+        """Stream a log_entries list, ENTRY_BATCH_SIZE entries per write"""
+        self.write_entry_batches((entries[start:start + ENTRY_BATCH_SIZE]
+                                  for start in range(0, len(entries), ENTRY_BATCH_SIZE)), level)
+
+    def write_file_summary(self, result, level):
+        self.file.write('{')
+        for i, (key, value) in enumerate(result.items()):
+            self.file.write(self.key_prefix(key, level + 1, i == 0))
+            if key == 'log_entries' and isinstance(value, list):
+                self.write_entries(value, level + 1)
+            elif key == 'log_entries' and not isinstance(value, dict):
+                # An iterable of entry batches, e.g. read back from an entries file
+                self.write_entry_batches(value, level + 1)
+            else:
+                self.file.write(self.encode(value, level + 1))
+        if result:
+            self.file.write(self.newline(level))
+        self.file.write('}')
+
+    def write_file_summaries(self, results):
+        """
+        Write the file_summaries key from an iterable of per-file results
+
+        Each result is written as soon as the iterable yields it.
+        """
+        self.file.write(self.key_prefix('file_summaries', 1, self.first_key))
+        self.first_key = False
+        self.write_list(results, 1, self.write_file_summary)
+
+def write_summary(summary, path, indent=DEFAULT_INDENT):
+    """
+    Write a summary dict to path, streaming its file_summaries
+    """
+    with SummaryWriter(path, indent=indent) as writer:
+        for key, value in summary.items():
+            if key == 'file_summaries':
+                writer.write_file_summaries(value)
+            else:
+                writer.write_field(key, value)
+    return path
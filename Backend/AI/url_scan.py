@@ -1,10 +1,199 @@
-import requests, re, json, os, argparse, sys, ssl, socket
+import requests, re, json, os, argparse, sys, ssl, socket, threading, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial
+from http.cookiejar import DefaultCookiePolicy
 from urllib.parse import urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from response_fingerprint import DEFAULT_SIMILARITY_THRESHOLD, ResponseFingerprint
+from scan_signatures import get_default_signatures, load_signatures
 try:
     import google.generativeai as genai
 except ImportError:
     genai = None
 
+# Requests in flight against one host at a time
+DEFAULT_HOST_CONCURRENCY = 8
+
+# Batch mode: targets scanned at once, and requests in flight across all of them
+DEFAULT_MAX_TARGETS = 32
+DEFAULT_MAX_REQUESTS = 128
+
+# Seconds before a probe request gives up
+REQUEST_TIMEOUT = 8
+
+# Seconds allowed for the SSL check's handshake
+SSL_TIMEOUT = 5
+
+# Hosts a scan session keeps connection pools for (the target plus any it redirects to)
+DEFAULT_POOL_HOSTS = 10
+
+# Bounded retries for failed connects and gateway errors, with exponential backoff
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (502, 503, 504)
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5"
+}
+
+# Parameters probed when the URL has no query string
+DEFAULT_TEST_PARAMS = ["id", "title", "search", "q", "name"]
+
+# SQL injection payloads
+SQL_PAYLOADS = {
+    "true_condition": "' OR '1'='1",
+    "false_condition": "' OR '1'='2", 
+    "union_select": "' UNION SELECT 1,2,3--",
+    "error_based": "' AND (SELECT COUNT(*) FROM (SELECT 1 UNION SELECT 2)x GROUP BY CONCAT(version(),FLOOR(RAND(0)*2)))--",
+    "time_delay": "' OR SLEEP(2)--",
+    "numeric_true": " OR 1=1--",
+    "numeric_false": " OR 1=2--",
+    "quote_break": "'",
+    "double_quote_break": '"',
+    "comment_break": "/*"
+}
+
+XSS_PAYLOADS = [
+    "<script>alert(1)</script>",
+    "<img src=x onerror=alert(1)>",
+    "<svg onload=alert(1)>",
+    "javascript:alert(1)",
+    "'\"><script>alert(1)</script>",
+    "<iframe src=javascript:alert(1)>",
+    "<body onload=alert(1)>",
+    "<<SCRIPT>alert(1);//<</SCRIPT>"
+]
+
+class HostLimiter:
+    """
+    Caps the requests in flight against each host, and optionally in total
+
+    Share one limiter between scans running at the same time and the caps
+    hold across all of them, not just within each scan.
+    """
+    def __init__(self, per_host=DEFAULT_HOST_CONCURRENCY, total=None):
+        self.per_host = per_host
+        self.total = threading.BoundedSemaphore(total) if total else None
+        self.lock = threading.Lock()
+        self.semaphores = {}
+
+    def get(self, url):
+        """The semaphore for url's host"""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self.semaphores[host]
+
+    @contextmanager
+    def slot(self, url):
+        """Hold a request slot for url's host and, with a total cap, a global one"""
+        # Host first, so a request waiting on a busy host doesn't hold a global slot
+        with self.get(url):
+            if self.total is None:
+                yield
+            else:
+                with self.total:
+                    yield
+
+class ConnectionCounter:
+    """
+    TCP connects and TLS handshakes actually made by a session's connections
+
+    A pool's num_connections only counts the connection objects it created;
+    a keep-alive connection the server closed reconnects inside the same
+    object, so connects are counted in connect() itself.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connects = 0
+        self.tls_handshakes = 0
+
+    def add(self, tls=False):
+        with self.lock:
+            self.connects += 1
+            if tls:
+                self.tls_handshakes += 1
+
+def counting_pool_classes(counter):
+    """urllib3 pool classes by scheme whose connections report each connect to counter"""
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self):
+            super().connect()
+            counter.add()
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            super().connect()
+            counter.add(tls=True)
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+class CountingAdapter(HTTPAdapter):
+    """An HTTPAdapter whose pools count the connects they make in self.counter"""
+    def __init__(self, *args, **kwargs):
+        self.counter = ConnectionCounter()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = counting_pool_classes(self.counter)
+
+def create_session(pool_size=DEFAULT_HOST_CONCURRENCY, retries=DEFAULT_RETRIES, backoff=RETRY_BACKOFF):
+    """
+    A requests session whose keep-alive pools hold pool_size connections per host
+
+    Connects and 502/503/504 answers are retried up to retries times with
+    exponential backoff; read timeouts are not, so a slow probe costs one
+    timeout. Cookies are never stored, so probes sent in parallel don't
+    see each other's cookies, as with separate requests.get calls.
+    """
+    session = requests.Session()
+    retry = Retry(total=retries, connect=retries, read=0, status=retries, backoff_factor=backoff,
+                  status_forcelist=RETRY_STATUSES, allowed_methods=frozenset(['GET']),
+                  respect_retry_after_header=False, raise_on_status=False)
+    adapter = CountingAdapter(pool_connections=DEFAULT_POOL_HOSTS, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+def get_connection_stats(session, ssl_checks=0):
+    """
+    Requests sent and connections opened by a session, the SSL check's included
+
+    Without keep-alive every request, and the SSL check, would have opened
+    (and for HTTPS handshaked) a connection of its own.
+    """
+    stats = {"requests": ssl_checks, "connections": ssl_checks, "tls_handshakes": ssl_checks}
+    for adapter in set(session.adapters.values()):
+        counter = getattr(adapter, 'counter', None)
+        if counter is None:
+            continue
+        pools = adapter.poolmanager.pools
+        stats["requests"] += sum(pools[key].num_requests for key in pools.keys())
+        stats["connections"] += counter.connects
+        stats["tls_handshakes"] += counter.tls_handshakes
+    stats["handshakes_avoided"] = max(stats["requests"] - stats["connections"], 0)
+    return stats
+
+def fetch(url, limiter, session=None, **kwargs):
+    """GET url once the host has a free slot"""
+    with limiter.slot(url):
+        return (session or requests).get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+
 def parse_version(header_value):
     """Extract version numbers from a header value (e.g. 'Apache/2.4.41')."""
     match = re.search(r'(\d+\.\d+(?:\.\d+)?)', header_value or "")
@@ -47,10 +236,10 @@ def check_ssl(url):
         result["issues"].append("Not using HTTPS")
         return result
     
-    hostname = parsed_url.netloc.split(':')[0]
+    hostname = parsed_url.hostname
     try:
         context = ssl.create_default_context()
-        with socket.create_connection((hostname, 443), timeout=5) as sock:
+        with socket.create_connection((hostname, parsed_url.port or 443), timeout=SSL_TIMEOUT) as sock:
             with context.wrap_socket(sock, server_hostname=hostname) as ssock:
                 cert = ssock.getpeercert()
                 result["valid"] = True
@@ -69,7 +258,39 @@ def check_ssl(url):
     
     return result
 
-def scan_website(url):
+def run_concurrently(calls, max_workers):
+    """
+    Run zero-argument callables on a thread pool
+
+    Returns a (result, exception) pair per call, in the order the calls
+    were given, however the requests finish.
+    """
+    def run(call):
+        try:
+            return call(), None
+        except Exception as e:
+            return None, e
+    
+    if not calls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls)))) as executor:
+        return list(executor.map(run, calls))
+
+def scan_website(url, concurrency=DEFAULT_HOST_CONCURRENCY, limiter=None, session=None, retries=DEFAULT_RETRIES,
+                 signatures=None, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """
+    Scan one URL: banner and security headers, SSL, SQL injection and XSS probes
+
+    The probes don't depend on each other, so they are all sent up front,
+    at most concurrency at a time against the host (or what a shared
+    limiter allows), and the responses are analyzed in a fixed order; the
+    results are the same as sending them one by one. Requests go over the
+    keep-alive pools of session (a new one sized for concurrency when not
+    given) and results["connection_stats"] counts the connects they saved.
+    Responses are checked against signatures, a ScanSignatures (the
+    built-in signatures by default), and SQL probes whose words are less
+    than similarity_threshold similar to the baseline count as changed.
+    """
     results = {
         "headers": {}, 
         "technologies": [], 
@@ -79,26 +300,28 @@ def scan_website(url):
         "ssl_info": {},
         "errors": []
     }
+    limiter = limiter or HostLimiter(concurrency)
+    signatures = signatures or get_default_signatures()
     
     # Check if URL is properly formatted
     if not url.startswith(('http://', 'https://')):
         results["errors"].append("Invalid URL format. URL must start with http:// or https://")
         return results
     
+    own_session = session is None
+    session = session or create_session(pool_size=concurrency, retries=retries)
+    ssl_checks = 0
+    
     # Check SSL if using HTTPS
     if url.startswith('https://'):
         results["ssl_info"] = check_ssl(url)
+        ssl_checks = 1
     else:
         results["ssl_info"] = {"valid": False, "issues": ["Not using HTTPS"]}
     
     # Send GET to grab headers (banner grabbing)
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5"
-        }
-        resp = requests.get(url, timeout=8, headers=headers, allow_redirects=True)
+        resp = fetch(url, limiter, session, headers=REQUEST_HEADERS, allow_redirects=True)
         results["headers"] = dict(resp.headers)
 
         # Check important security headers
@@ -139,87 +362,72 @@ def scan_website(url):
         # Parse URL to extract existing parameters
         parsed_url = urlparse(url)
         existing_params = parse_qs(parsed_url.query)
+        endpoint = parsed_url.scheme + "://" + parsed_url.netloc + parsed_url.path
         
-        # SQL injection payloads
-        sql_payloads = {
-            "true_condition": "' OR '1'='1",
-            "false_condition": "' OR '1'='2", 
-            "union_select": "' UNION SELECT 1,2,3--",
-            "error_based": "' AND (SELECT COUNT(*) FROM (SELECT 1 UNION SELECT 2)x GROUP BY CONCAT(version(),FLOOR(RAND(0)*2)))--",
-            "time_delay": "' OR SLEEP(2)--",
-            "numeric_true": " OR 1=1--",
-            "numeric_false": " OR 1=2--",
-            "quote_break": "'",
-            "double_quote_break": '"',
-            "comment_break": "/*"
-        }
+        # Preserve existing parameters in every probe
+        baseline_params = {}
+        for k, v in existing_params.items():
+            baseline_params[k] = v[0] if v else ""
         
         # Test parameters found in URL
-        test_params = list(existing_params.keys()) if existing_params else ["id", "title", "search", "q", "name"]
+        test_params = list(existing_params.keys()) if existing_params else DEFAULT_TEST_PARAMS
+        
+        # Queue every request: per parameter a baseline and the SQL payloads, then the XSS payloads
+        probes = []
+        for param_name in test_params:
+            probes.append(partial(fetch, endpoint, limiter, session, params=baseline_params, headers=REQUEST_HEADERS))
+            for payload in SQL_PAYLOADS.values():
+                test_params_dict = dict(baseline_params)
+                # If testing an existing parameter, modify it; otherwise add the test parameter
+                if param_name in existing_params:
+                    original_value = existing_params[param_name][0] if existing_params[param_name] else ""
+                    test_params_dict[param_name] = original_value + payload
+                else:
+                    test_params_dict[param_name] = payload
+                probes.append(partial(fetch, endpoint, limiter, session, params=test_params_dict, headers=REQUEST_HEADERS))
+        for param_name in test_params:
+            for payload in XSS_PAYLOADS:
+                test_params_dict = dict(baseline_params)
+                test_params_dict[param_name] = payload
+                probes.append(partial(fetch, endpoint, limiter, session, params=test_params_dict, headers=REQUEST_HEADERS))
+        
+        responses = iter(run_concurrently(probes, concurrency))
         
         for param_name in test_params:
             param_results = []
             baseline_response = None
             
             # Get baseline response for this parameter
-            try:
-                baseline_params = {}
-                for k, v in existing_params.items():
-                    baseline_params[k] = v[0] if v else ""
-                
-                baseline_req = requests.get(parsed_url.scheme + "://" + parsed_url.netloc + parsed_url.path, 
-                                          params=baseline_params, timeout=8, headers=headers)
+            baseline_req, failure = next(responses)
+            if failure is None:
                 baseline_response = baseline_req.text or ""
                 baseline_length = len(baseline_response)
-            except:
+            else:
                 baseline_length = base_length
                 baseline_response = base_content
+            # Tokenized once here rather than for every payload
+            baseline_fingerprint = ResponseFingerprint(baseline_response, similarity_threshold)
             
-            for payload_name, payload in sql_payloads.items():
+            for payload_name in SQL_PAYLOADS:
                 try:
-                    test_params_dict = {}
-                    # Preserve existing parameters
-                    for k, v in existing_params.items():
-                        test_params_dict[k] = v[0] if v else ""
-                    
-                    # If testing an existing parameter, modify it; otherwise add the test parameter
-                    if param_name in existing_params:
-                        original_value = existing_params[param_name][0] if existing_params[param_name] else ""
-                        test_params_dict[param_name] = original_value + payload
-                    else:
-                        test_params_dict[param_name] = payload
-                    
-                    r = requests.get(parsed_url.scheme + "://" + parsed_url.netloc + parsed_url.path, 
-                                   params=test_params_dict, timeout=8, headers=headers)
+                    r, failure = next(responses)
+                    if failure is not None:
+                        raise failure
                     
-                    response_length = len(r.text or "")
+                    # r.text decodes the body again on every access
                     response_content = r.text or ""
+                    response_length = len(response_content)
+                    lowered_content = response_content.lower()
                     
                     # Check for SQL injection indicators
-                    sql_errors = [
-                        "mysql_fetch", "ORA-", "Microsoft OLE DB", "ODBC", "SQLException", 
-                        "PostgreSQL", "Warning: mysql", "valid MySQL result", "MySqlClient",
-                        "syntax error", "quoted string not properly terminated", "unclosed quotation mark",
-                        "mysql_num_rows", "mysql_", "Warning:", "Fatal error", "Parse error",
-                        "SQL syntax", "Database error", "ORA-01756", "Microsoft Access Driver",
-                        "JET Database Engine", "Access Database Engine"
-                    ]
-                    
-                    error_detected = any(error.lower() in response_content.lower() for error in sql_errors)
+                    error_detected = signatures.sql_error(lowered_content, lowered=True) is not None
                     
                     # More sophisticated length analysis
                     length_diff = response_length - baseline_length
                     significant_length_change = abs(length_diff) > (baseline_length * 0.1)  # 10% change
                     
-                    # Check for different response patterns
-                    response_differs_significantly = False
-                    if baseline_response and response_content:
-                        # Simple content comparison
-                        common_words = set(baseline_response.lower().split()) & set(response_content.lower().split())
-                        total_words = len(set(baseline_response.lower().split()) | set(response_content.lower().split()))
-                        if total_words > 0:
-                            similarity = len(common_words) / total_words
-                            response_differs_significantly = similarity < 0.7  # Less than 70% similarity
+                    # Check for different response patterns: word-set similarity below the threshold
+                    response_differs_significantly = baseline_fingerprint.differs(lowered_content, lowered=True)
                     
                     test_result = {
                         "param": param_name,
@@ -243,48 +451,22 @@ def scan_website(url):
         
         results["vuln_tests"]["sql_injection"] = vuln_sql
         results["vuln_tests"]["sql_injection_suspected"] = sql_injection_detected# Enhanced XSS test: check reflection of payloads in existing parameters
-        xss_payloads = [
-            "<script>alert(1)</script>",
-            "<img src=x onerror=alert(1)>",
-            "<svg onload=alert(1)>",
-            "javascript:alert(1)",
-            "'\"><script>alert(1)</script>",
-            "<iframe src=javascript:alert(1)>",
-            "<body onload=alert(1)>",
-            "<<SCRIPT>alert(1);//<</SCRIPT>"
-        ]
         xss_results = []
         xss_detected = False
         
         for param_name in test_params:
-            for payload in xss_payloads:
+            for payload in XSS_PAYLOADS:
                 try:
-                    test_params_dict = {}
-                    # Preserve existing parameters
-                    for k, v in existing_params.items():
-                        test_params_dict[k] = v[0] if v else ""
-                    
-                    # Test the parameter with XSS payload
-                    if param_name in existing_params:
-                        test_params_dict[param_name] = payload
-                    else:
-                        test_params_dict[param_name] = payload
-                    
-                    r = requests.get(parsed_url.scheme + "://" + parsed_url.netloc + parsed_url.path, 
-                                   params=test_params_dict, timeout=8, headers=headers)
+                    r, failure = next(responses)
+                    if failure is not None:
+                        raise failure
                     
                     response_content = r.text or ""
                     
                     # Check for direct reflection (exact match)
                     direct_reflected = payload in response_content
                       # Check for partial reflection (payload components)
-                    partial_reflected = False
-                    if "<script>" in payload and "<script>" in response_content.lower():
-                        partial_reflected = True
-                    elif "alert(" in payload and "alert(" in response_content.lower():
-                        partial_reflected = True
-                    elif "onerror=" in payload and "onerror=" in response_content.lower():
-                        partial_reflected = True
+                    partial_reflected = signatures.xss_partial(payload, response_content)
                     
                     if direct_reflected or partial_reflected:
                         xss_detected = True
@@ -324,6 +506,9 @@ def scan_website(url):
     except Exception as e:
         results["errors"].append(f"Unexpected error: {str(e)}")
 
+    results["connection_stats"] = get_connection_stats(session, ssl_checks)
+    if own_session:
+        session.close()
     return results
 
 def generate_manual_summary(results):
@@ -362,15 +547,13 @@ def generate_manual_summary(results):
     
     return "\n".join(summary)
 
-def main():
-    parser = argparse.ArgumentParser(description="Lightweight web scanner")
-    parser.add_argument("url", help="Target URL to scan (include http:// or https://)")
-    parser.add_argument("--skip-ai", action="store_true", help="Skip Gemini summary generation")
-    args = parser.parse_args()
-    url = args.url.rstrip("/")
-    raw_results = scan_website(url)    # Summarize using Gemini
+def build_scan_report(url, skip_ai=False, concurrency=DEFAULT_HOST_CONCURRENCY, limiter=None,
+                      retries=DEFAULT_RETRIES, signatures=None, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """Scan a URL and return the report printed by the CLI: raw results plus a summary."""
+    url = url.rstrip("/")
+    raw_results = scan_website(url, concurrency=concurrency, limiter=limiter, retries=retries,
+                               signatures=signatures, similarity_threshold=similarity_threshold)    # Summarize using Gemini
     summary_text = ""
-    skip_ai = args.skip_ai
     
     if not skip_ai and genai and not raw_results.get("errors"):
         api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GITHUB_TOKEN")
@@ -398,7 +581,130 @@ def main():
     if not summary_text or "Error" in summary_text or "not found" in summary_text or "not installed" in summary_text:
         summary_text = manual_summary
 
-    output = {"url": url, "raw_results": raw_results, "summary": summary_text}
+    return {"url": url, "raw_results": raw_results, "summary": summary_text}
+
+def read_targets(source):
+    """
+    Yield target URLs from a file, or stdin for '-': one per line, blanks and # comments skipped, duplicates dropped
+
+    Lines are read as the scans take them, so only the set of URLs seen so
+    far is held in memory, not the whole list.
+    """
+    f = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        seen = set()
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and line not in seen:
+                seen.add(line)
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def iter_scan_reports(urls, max_targets=DEFAULT_MAX_TARGETS, concurrency=DEFAULT_HOST_CONCURRENCY,
+                      max_requests=DEFAULT_MAX_REQUESTS, skip_ai=True, retries=DEFAULT_RETRIES, signatures=None,
+                      similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """
+    Scan many URLs at once, yielding each report as soon as its scan finishes
+
+    Up to max_targets scans run at a time. They share one HostLimiter, so
+    a host listed several times gets at most concurrency requests in
+    flight and all hosts together at most max_requests. Only a bounded
+    number of scans is queued ahead, so a long target list is read
+    through lazily. Reports come in completion order, each with the
+    seconds its scan took.
+    """
+    limiter = HostLimiter(concurrency, total=max_requests)
+    
+    def scan(url):
+        started = time.time()
+        try:
+            report = build_scan_report(url, skip_ai=skip_ai, concurrency=concurrency, limiter=limiter,
+                                       retries=retries, signatures=signatures,
+                                       similarity_threshold=similarity_threshold)
+        except Exception as e:
+            report = {"url": url, "error": str(e)}
+        report["seconds"] = round(time.time() - started, 3)
+        return report
+    
+    urls = iter(urls)
+    pending = set()
+    with ThreadPoolExecutor(max_workers=max_targets) as executor:
+        while True:
+            for url in urls:
+                pending.add(executor.submit(scan, url))
+                if len(pending) >= max_targets:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def run_batch(targets, output, **scan_kwargs):
+    """
+    Scan an iterable of targets, writing each report to output as one NDJSON line when it finishes
+    """
+    started = time.time()
+    out = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8')
+    scanned = 0
+    failed = 0
+    try:
+        for report in iter_scan_reports(targets, **scan_kwargs):
+            out.write(json.dumps(report) + "\n")
+            out.flush()
+            scanned += 1
+            if report.get("error") or report.get("raw_results", {}).get("errors"):
+                failed += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Scanned {scanned} targets in {time.time() - started:.1f}s ({failed} with errors)", file=sys.stderr)
+    return scanned
+
+def main():
+    parser = argparse.ArgumentParser(description="Lightweight web scanner")
+    parser.add_argument("url", nargs="?", help="Target URL to scan (include http:// or https://)")
+    parser.add_argument("--skip-ai", action="store_true", help="Skip Gemini summary generation")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_HOST_CONCURRENCY,
+                        help=f"Probe requests in flight against the host at once (default: {DEFAULT_HOST_CONCURRENCY})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"Retries for failed connects and 502/503/504 answers (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--targets", type=str, default=None,
+                        help="Batch mode: file of target URLs, one per line, or - for stdin")
+    parser.add_argument("--output", type=str, default="-",
+                        help="Batch mode: NDJSON file to write one report line per target to (default: stdout)")
+    parser.add_argument("--max-targets", type=int, default=DEFAULT_MAX_TARGETS,
+                        help=f"Batch mode: targets scanned at once (default: {DEFAULT_MAX_TARGETS})")
+    parser.add_argument("--max-requests", type=int, default=DEFAULT_MAX_REQUESTS,
+                        help=f"Batch mode: requests in flight across all targets (default: {DEFAULT_MAX_REQUESTS})")
+    parser.add_argument("--signatures", type=str, action="append", default=[],
+                        help="JSON file of extra 'sql_errors' and 'xss_markers' signatures (can be repeated)")
+    parser.add_argument("--similarity-threshold", type=float, default=DEFAULT_SIMILARITY_THRESHOLD,
+                        help="SQL probes whose words are less similar than this to the baseline count as changed "
+                             f"(default: {DEFAULT_SIMILARITY_THRESHOLD})")
+    args = parser.parse_args()
+    
+    try:
+        signatures = load_signatures(args.signatures)
+    except (OSError, ValueError) as e:
+        print(f"Error loading signatures: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.targets:
+        if args.url:
+            parser.error("give either a url or --targets, not both")
+        targets = read_targets(args.targets)
+        run_batch(targets, args.output, max_targets=args.max_targets, concurrency=args.concurrency,
+                  max_requests=args.max_requests, skip_ai=args.skip_ai, retries=args.retries, signatures=signatures,
+                  similarity_threshold=args.similarity_threshold)
+        return
+    if not args.url:
+        parser.error("a url or --targets is required")
+    
+    output = build_scan_report(args.url, skip_ai=args.skip_ai, concurrency=args.concurrency, retries=args.retries,
+                               signatures=signatures, similarity_threshold=args.similarity_threshold)
     print(json.dumps(output, indent=2))
 
 if __name__ == "__main__":   
@@ -3,6 +3,8 @@ import sys
 import argparse
 import pandas as pd
 import json
+import shutil
+import tempfile
 from datetime import datetime
 
 # Add the AI directory to the path
@@ -10,6 +12,12 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 ai_dir = os.path.join(script_dir, 'AI')
 sys.path.append(ai_dir)
 
+from AI.log_encoding import candidate_encodings
+from AI.log_formats import TABLE_FORMATS
+from AI.summary_writer import DEFAULT_INDENT, read_summary, write_summary
+# Imported the way the AI modules import it, so their stages record into our run
+from pipeline_perf import PROFILE_ENV_VAR, PerfRun, perf_stage, profile_to
+
 def create_sample_predictions(log_file, output_path):
     """
     Create sample predictions when modules cannot be imported
@@ -18,8 +26,12 @@ def create_sample_predictions(log_file, output_path):
     
     try:
         # Read log file with proper encoding handling
-        encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']
         df = None
+        try:
+            encodings = candidate_encodings(log_file)
+        except OSError as e:
+            print(f"Error reading {log_file}: {str(e)}")
+            encodings = []
         
         for encoding in encodings:
             try:
@@ -73,65 +85,188 @@ def create_sample_predictions(log_file, output_path):
         traceback.print_exc()
         return None
 
-def main():
-    parser = argparse.ArgumentParser(description='Run log analysis pipeline')
-    parser.add_argument('--log-file', type=str, help='Path to log file for analysis')
-    parser.add_argument('--summary-file', type=str, help='Path to save summary JSON')
-    args = parser.parse_args()
+def print_perf(perf):
+    """
+    Print the per-stage timings of a perf block
+    """
+    print(f"Performance: {perf['total_seconds']:.2f}s total, peak RSS {perf['peak_rss_mb']} MB")
+    for name, stage in perf['stages'].items():
+        rows = f", {stage['rows']} rows" if 'rows' in stage else ''
+        print(f"  {name}: {stage['seconds']:.3f}s{rows}")
+
+def open_result_cache(args, log_file):
+    """
+    Open the result cache and compute the key of this run, or return (None, None)
+    """
+    if args.no_cache:
+        return None, None
+    try:
+        from AI.result_cache import ResultCache
+        from AI.log_analysis_pipeline import get_default_model_path
+        cache = ResultCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+        options = {
+            'output_format': args.output_format,
+            'predictions': bool(args.save_predictions or args.chunk_size),
+            # Chunked runs summarize through a different path, so they never share an entry with in-memory runs
+            'chunked': bool(args.chunk_size),
+            'top_entries': args.top_entries if args.compact else None,
+            'json_indent': args.json_indent,
+            'gzip': bool(args.summary_file and args.summary_file.endswith('.gz')),
+        }
+        key = cache.make_key(log_file, get_default_model_path(), options=options)
+        return cache, key
+    except Exception as e:
+        print(f"Error opening result cache: {str(e)}")
+        return None, None
+
+def restore_cached_result(cached, args, log_file, perf_run):
+    """
+    Copy a cached summary (and predictions file) to where this run would write them
+
+    The summary gets this run's timestamp and perf block, not the cached
+    run's. Returns False if the entry lacks a predictions file this run needs.
+    """
+    from AI.log_analysis_pipeline import get_output_path
     
+    wants_predictions = args.save_predictions or args.chunk_size
+    if wants_predictions and cached['predictions'] is None:
+        return False
+    
+    if wants_predictions:
+        prediction_file = get_output_path(log_file, args.output_format)
+        shutil.copyfile(cached['predictions'], prediction_file)
+        print(f"Predictions saved to: {prediction_file}")
+    summary_file = args.summary_file or os.path.join(os.path.dirname(log_file), 'summary.json')
+    summary_output = read_summary(cached['summary'])
+    if cached['entries']:
+        # Point the compact summary at the entries file under its new name
+        from AI.log_summary_generator import get_entries_path
+        entries_file = get_entries_path(summary_file)
+        shutil.copyfile(cached['entries'], entries_file)
+        summary_output['file_summaries'][0]['entries_file']['path'] = os.path.basename(entries_file)
+    summary_output['timestamp'] = datetime.now().isoformat()
+    summary_output['perf'] = perf_run.as_dict()
+    write_summary(summary_output, summary_file, indent=args.json_indent)
+    print(f"Summary saved to: {summary_file}")
+    return True
+
+def run_pipeline(args, perf_run):
+    """
+    Score the log file, summarize it and write the summary JSON
+    
+    Stage timings collected in perf_run are saved in the summary's perf block.
+    """
     # Set default log file path if not provided
     log_file = args.log_file or os.path.join(script_dir, 'uploads', 'sample_log.csv')
     print(f"Using log file: {log_file}")
     
+    # The same bytes scored by the same model give the same summary
+    with perf_stage('cache_lookup') as stage:
+        cache, cache_key = open_result_cache(args, log_file)
+        cached = cache.lookup(cache_key) if cache else None
+        stage.set('hit', cached is not None)
+    if cached:
+        try:
+            if restore_cached_result(cached, args, log_file, perf_run):
+                print(f"Cache hit for {log_file}, skipped analysis")
+                print_perf(perf_run.as_dict())
+                return
+        except Exception as e:
+            print(f"Error restoring cached result: {str(e)}")
+    
     prediction_file = None
+    analysis_result = None
     analysis_modules_loaded = False
+    model_components = None
     
     # Try to import modules from AI directory
     try:
-        from AI.log_analysis_pipeline import load_model, process_log_file
-        from AI.log_summary_generator import analyze_prediction_file, generate_text_summary, generate_recommended_actions
+        from AI.log_analysis_pipeline import load_default_model, process_log_file, analyze_log_file, DEFAULT_BATCH_SIZE
+        from AI.log_summary_generator import (analyze_prediction_file, add_recommendations, compact_result,
+                                              summarize_prediction_chunks)
         analysis_modules_loaded = True
         
         # Load the model
         try:
-            model_components = load_model(os.path.join(ai_dir, 'best_model.pkl'))
+            model_components = load_default_model()
         except Exception as e:
             print(f"Failed to load model: {e}")
             model_components = None
         
-        # Process the log file
+        # Process the log file. Streaming has to go through the predictions file,
+        # otherwise the scored rows are handed to the summarizer in memory
         try:
             print(f"Analyzing log file: {log_file}")
-            prediction_file = process_log_file(log_file, model_components)
+            batch_size = args.batch_size or DEFAULT_BATCH_SIZE
+            if args.chunk_size:
+                prediction_file = process_log_file(log_file, model_components,
+                                                   batch_size=batch_size,
+                                                   chunk_size=args.chunk_size,
+                                                   output_format=args.output_format,
+                                                   workers=args.workers)
+            else:
+                analysis_result, prediction_file = analyze_log_file(log_file, model_components,
+                                                                    batch_size=batch_size,
+                                                                    save_predictions=args.save_predictions,
+                                                                    output_format=args.output_format,
+                                                                    workers=args.workers)
         except Exception as e:
             print(f"Failed to process log file: {e}")
             prediction_file = None
+            analysis_result = None
     except ImportError as e:
         print(f"Error importing analysis modules: {e}")
         analysis_modules_loaded = False
     
     # If imports failed or processing failed, create sample predictions
-    if not analysis_modules_loaded or prediction_file is None:
+    if not analysis_modules_loaded or (prediction_file is None and analysis_result is None):
         print("Using fallback sample prediction generation")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         prediction_file = os.path.join(os.path.dirname(log_file), f"sample_predictions_{timestamp}.csv")
-        prediction_file = create_sample_predictions(log_file, prediction_file)
+        # Random predictions must not be served again
+        cache = None
+        with perf_stage('sample_predictions'):
+            prediction_file = create_sample_predictions(log_file, prediction_file)
         
         # Re-import just log_summary_generator
         try:
-            from AI.log_summary_generator import analyze_prediction_file, generate_text_summary, generate_recommended_actions
+            from AI.log_summary_generator import (analyze_prediction_file, add_recommendations, compact_result,
+                                                  summarize_prediction_chunks)
             analysis_modules_loaded = True
         except ImportError:
             print("Cannot import log_summary_generator, using simplified analysis")
             analysis_modules_loaded = False
     
-    if prediction_file is None:
+    if prediction_file is None and analysis_result is None:
         print("Failed to generate predictions. Exiting.")
         sys.exit(1)
     
+    summary_file = args.summary_file or os.path.join(os.path.dirname(prediction_file or log_file), 'summary.json')
+    entries_file = None
+    # Entries of a full (not compact) summary made chunk by chunk, streamed from disk into the summary
+    spooled_entries_file = None
+    summarized_in_chunks = False
+    
     # Perform analysis
     try:
-        if analysis_modules_loaded:
+        if analysis_result is not None:
+            # Already summarized in memory
+            pass
+        elif analysis_modules_loaded and args.chunk_size:
+            # Summarized chunk by chunk too, so memory stays bounded by the chunk size
+            from AI.log_summary_generator import get_entries_path
+            if args.compact:
+                entries_file = get_entries_path(summary_file)
+            else:
+                fd, spooled_entries_file = tempfile.mkstemp(suffix='.ndjson', dir=os.path.dirname(summary_file) or None)
+                os.close(fd)
+            analysis_result = summarize_prediction_chunks(prediction_file, args.chunk_size,
+                                                          entries_file or spooled_entries_file,
+                                                          top_n=args.top_entries if args.compact else None)
+            summarized_in_chunks = True
+            if entries_file:
+                print(f"Entries saved to: {entries_file}")
+        elif analysis_modules_loaded:
             analysis_result = analyze_prediction_file(prediction_file)
         else:
             # Simplified analysis if modules couldn't be imported
@@ -160,25 +295,19 @@ def main():
                 'log_entries': log_entries
             }
             
-        # Generate text summary if function is available
-        if analysis_modules_loaded:
-            analysis_result['text_summary'] = generate_text_summary(
-                analysis_result['total_records'],
-                analysis_result['prediction_counts'],
-                analysis_result['prediction_percentages'],
-                high_count=sum(1 for e in analysis_result.get('log_entries', []) if e.get('sensitivity') == 'HIGH'),
-                medium_count=sum(1 for e in analysis_result.get('log_entries', []) if e.get('sensitivity') == 'MEDIUM'),
-                low_count=sum(1 for e in analysis_result.get('log_entries', []) if e.get('sensitivity') == 'LOW')
-            )
-            
-            # Generate recommended actions if function is available
-            analysis_result['recommended_actions'] = generate_recommended_actions(
-                analysis_result['prediction_counts'],
-                high_alerts=sum(1 for e in analysis_result.get('log_entries', []) 
-                              if e.get('sensitivity') == 'HIGH' and e.get('status') == 'ALERT'),
-                has_attack='attack' in analysis_result['prediction_counts'] and analysis_result['prediction_counts']['attack'] > 0,
-                has_probe='probe' in analysis_result['prediction_counts'] and analysis_result['prediction_counts']['probe'] > 0
-            )
+        # Generate text summary and recommended actions if functions are available
+        if summarized_in_chunks:
+            # summarize_prediction_chunks added them from its aggregate
+            pass
+        elif analysis_modules_loaded:
+            with perf_stage('recommendations'):
+                add_recommendations(analysis_result)
+            if args.compact:
+                from AI.log_summary_generator import get_entries_path
+                entries_file = get_entries_path(summary_file)
+                with perf_stage('compact'):
+                    compact_result(analysis_result, entries_file=entries_file, top_n=args.top_entries)
+                print(f"Entries saved to: {entries_file}")
         else:
             # Generate basic text summary manually
             severity = "critical" if "attack" in prediction_counts else "concerning" if "probe" in prediction_counts else "stable"
@@ -193,32 +322,15 @@ def main():
                 
             analysis_result['recommended_actions'] = recommendations
         
-        # Add recommended action to each log entry if not present
-        for entry in analysis_result.get('log_entries', []):
-            if 'recommendedAction' not in entry:
-                if entry.get('type') == 'normal':
-                    entry['recommendedAction'] = "No action required"
-                elif entry.get('type') == 'probe' and entry.get('sensitivity') == 'LOW':
-                    entry['recommendedAction'] = "Monitor source IP for further suspicious activity"
-                elif entry.get('type') == 'probe':
-                    entry['recommendedAction'] = "Block source IP and investigate"
-                elif entry.get('type') == 'attack':
-                    entry['recommendedAction'] = "Immediately isolate affected systems and investigate"
-                elif entry.get('type') == 'anomaly':
-                    entry['recommendedAction'] = "Review unusual behavior and investigate further"
-                else:
-                    entry['recommendedAction'] = "Further investigation required"
-        
         # Prepare the summary output
         summary_output = {
             'file_summaries': [analysis_result],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat(),
+            'perf': perf_run.as_dict()
         }
         
         # Save summary to file
-        summary_file = args.summary_file or os.path.join(os.path.dirname(prediction_file), 'summary.json')
-        with open(summary_file, 'w') as f:
-            json.dump(summary_output, f, indent=2)
+        write_summary(summary_output, summary_file, indent=args.json_indent)
         
         print(f"Summary saved to: {summary_file}")
         
@@ -231,12 +343,76 @@ def main():
             print(f"Text summary: {analysis_result['text_summary']}")
         if 'recommended_actions' in analysis_result:
             print(f"Recommended actions: {json.dumps(analysis_result['recommended_actions'], indent=2)}")
+        print_perf(summary_output['perf'])
+        
+        # Mock predictions are random too
+        if cache and model_components is not None and model_components.get('model') is not None:
+            try:
+                cache.store(cache_key, summary_file, prediction_file, entries_file)
+            except Exception as e:
+                print(f"Error caching result: {str(e)}")
         
     except Exception as e:
         print(f"Failed to generate summary: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if spooled_entries_file and os.path.exists(spooled_entries_file):
+            os.remove(spooled_entries_file)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run log analysis pipeline')
+    parser.add_argument('--log-file', type=str, help='Path to log file for analysis')
+    parser.add_argument('--summary-file', type=str, help='Path to save summary JSON')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Rows scored per model call (default: pipeline default)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Stream the log file, and summarize its predictions, in chunks of this many rows '
+                             'to bound memory use')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Score on this many processes sharing one feature matrix (0 = one per CPU core)')
+    parser.add_argument('--output-format', choices=list(TABLE_FORMATS), default='csv',
+                        help='File format for the intermediate predictions file (default: csv)')
+    parser.add_argument('--save-predictions', action='store_true',
+                        help='Also write the scored rows to a predictions file (always done with --chunk-size)')
+    parser.add_argument('--profile', type=str, default=os.environ.get(PROFILE_ENV_VAR),
+                        help=f'Write a cProfile dump of the run to this path (can also be set via {PROFILE_ENV_VAR})')
+    parser.add_argument('--follow', action='store_true',
+                        help='Keep tailing the log file, scoring only appended rows and updating the summary')
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help='Seconds between polls with --follow (default: 5)')
+    parser.add_argument('--checkpoint', type=str, default=None,
+                        help='Checkpoint file for --follow (default: <log-file>.checkpoint.json)')
+    parser.add_argument('--once', action='store_true',
+                        help='With --follow, score what has been appended since the checkpoint and exit')
+    parser.add_argument('--compact', action='store_true',
+                        help='Keep only the top alert entries in the summary and write all entries to an NDJSON file')
+    parser.add_argument('--top-entries', type=int, default=100,
+                        help='Alert entries kept in the summary with --compact (default: 100)')
+    parser.add_argument('--json-indent', type=int, default=DEFAULT_INDENT,
+                        help=f'Indentation of the summary JSON; 0 writes it without whitespace (default: {DEFAULT_INDENT}). '
+                             f'A --summary-file ending in .gz is gzipped')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always rerun the analysis instead of reusing the result for identical input')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='Directory of cached results (default: $REDHAWK_CACHE_DIR or AI/.cache/results)')
+    parser.add_argument('--cache-max-mb', type=int, default=1024,
+                        help='Size of the result cache before old entries are evicted (default: 1024)')
+    args = parser.parse_args()
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    
+    if args.follow:
+        from AI.log_follower import DEFAULT_BATCH_SIZE, follow_log
+        log_file = args.log_file or os.path.join(script_dir, 'uploads', 'sample_log.csv')
+        summary_file = args.summary_file or os.path.join(os.path.dirname(log_file), 'summary.json')
+        follow_log(log_file, summary_file, checkpoint_file=args.checkpoint, interval=args.interval,
+                   batch_size=args.batch_size or DEFAULT_BATCH_SIZE, once=args.once, indent=args.json_indent)
+        return
+    
+    with profile_to(args.profile), PerfRun() as perf_run:
+        run_pipeline(args, perf_run)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file